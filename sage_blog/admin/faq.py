@@ -7,12 +7,15 @@ from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
 from modeltranslation.admin import TabbedTranslationAdmin
 
+from sage_blog.admin.mixins import StreamingExportMixin
 from sage_blog.models import PostFaq
 from sage_blog.resources import PostFaqResource
 
 
 @admin.register(PostFaq)
-class PostFaqAdmin(ImportExportModelAdmin, TabbedTranslationAdmin):
+class PostFaqAdmin(
+    StreamingExportMixin, ImportExportModelAdmin, TabbedTranslationAdmin
+):
     """
     FAQ Admin
     """
@@ -14,7 +14,7 @@ class PostsStatusFilter(admin.SimpleListFilter):
 
     def queryset(self, request, queryset):
         if self.value() == "no_posts":
-            return queryset.filter(posts__isnull=True)
+            return queryset.filter(post_count=0)
         elif self.value() == "published_posts":
-            return queryset.filter_published_posts().distinct()
+            return queryset.filter_published().filter(published_post_count__gt=0)
         return queryset
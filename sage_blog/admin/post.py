@@ -1,12 +1,15 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 
 from sorl.thumbnail.admin import AdminImageMixin
 from import_export.admin import ImportExportModelAdmin
 from modeltranslation.admin import TabbedTranslationAdmin, TranslationTabularInline
 
-from sage_blog.models import Post, PostFaq
-from sage_blog.resources import PostResource
+from sage_blog.admin.mixins import StreamingExportMixin
+from sage_blog.models import Post, PostFaq, PostTag
+from sage_blog.resources import PostBulkResource, PostResource
 
 
 class PostFaqInline(TranslationTabularInline):
@@ -14,8 +17,26 @@ class PostFaqInline(TranslationTabularInline):
     extra = 1
 
 
+class PostChangeList(ChangeList):
+    """
+    Post changelist loading only the columns its rows display, so the wide
+    description, SEO and translation columns of posts are not read.
+    """
+
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        return queryset.only(*self.model_admin.list_only_fields).prefetch_related(
+            Prefetch("tags", queryset=PostTag.objects.only("title"))
+        )
+
+
 @admin.register(Post)
-class PostAdmin(ImportExportModelAdmin, TabbedTranslationAdmin, AdminImageMixin):
+class PostAdmin(
+    StreamingExportMixin,
+    ImportExportModelAdmin,
+    TabbedTranslationAdmin,
+    AdminImageMixin,
+):
     """
     Django admin customization for the Post model.
 
@@ -24,7 +45,7 @@ class PostAdmin(ImportExportModelAdmin, TabbedTranslationAdmin, AdminImageMixin)
     editing and adding new Posts.
     """
 
-    resource_class = PostResource
+    resource_classes = (PostResource, PostBulkResource)
 
     admin_priority = 2
     inlines = (PostFaqInline,)
@@ -39,6 +60,18 @@ class PostAdmin(ImportExportModelAdmin, TabbedTranslationAdmin, AdminImageMixin)
         "modified_at",
     )
     list_filter = ("is_published", "category", "published_at", "modified_at")
+    list_select_related = ("category",)
+    # Columns loaded by the changelist, the others are deferred
+    list_only_fields = (
+        "title",
+        "slug",
+        "is_published",
+        "category__title",
+        "summary",
+        "published_at",
+        "modified_at",
+    )
+    # Searched through `PostQuerySet.indexed_search`, see `get_search_results`
     search_fields = (
         "title",
         "slug",
@@ -142,8 +175,11 @@ class PostAdmin(ImportExportModelAdmin, TabbedTranslationAdmin, AdminImageMixin)
     def get_summary(obj):
         return obj.summary if obj.summary else _("No Summary")
 
-    # Filter customization
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        queryset = queryset.prefetch_related("tags")
-        return queryset
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.indexed_search(search_term), False
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
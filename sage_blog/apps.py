@@ -10,3 +10,9 @@ class SageBlogConfig(AppConfig):
     def ready(self) -> None:
         # noqa: F401, pylint: disable=import-outside-toplevel, unused-import
         import sage_blog.settings.check
+        import sage_blog.signals.cache
+        import sage_blog.signals.counters
+        import sage_blog.signals.search
+        from sage_blog.search.backends import configure_search_backend
+
+        configure_search_backend()
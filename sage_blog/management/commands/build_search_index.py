@@ -0,0 +1,41 @@
+import logging
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sage_blog.models import Post
+from sage_blog.search.backends import InvertedIndexSearchBackend
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the inverted index file used by the `inverted_index` search backend "
+        "from every post"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            help="Index file to write, defaults to SAGE_BLOG_SEARCH_INDEX_PATH.",
+        )
+
+    def handle(self, *args, **kwargs):
+        path = kwargs["path"] or getattr(settings, "SAGE_BLOG_SEARCH_INDEX_PATH", None)
+        if not path:
+            raise CommandError(
+                "Set SAGE_BLOG_SEARCH_INDEX_PATH or pass --path to build the index."
+            )
+
+        logger.info("Build Post Search Index")
+        start = timeit.default_timer()
+        index = InvertedIndexSearchBackend(path).build(Post)
+        stop = timeit.default_timer()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {index.document_count} posts and "
+                f"{len(index.postings)} words into {path} in {stop - start:.2f}s."
+            )
+        )
@@ -0,0 +1,65 @@
+import logging
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from sage_blog.resources import (
+    PostCategoryResource,
+    PostFaqResource,
+    PostResource,
+    PostTagResource,
+)
+from sage_blog.utils.import_export.stream import EXPORT_WRITERS, write_export
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = {
+    "posts": PostResource,
+    "categories": PostCategoryResource,
+    "tags": PostTagResource,
+    "faqs": PostFaqResource,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Export blog data as CSV or JSON lines, streaming rows in chunks so exports "
+        "of any size run in bounded memory"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=RESOURCES)
+        parser.add_argument("--format", choices=EXPORT_WRITERS, default="csv")
+        parser.add_argument(
+            "--output", help="File to write to, the standard output by default."
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Number of objects read per query, SAGE_BLOG_EXPORT_CHUNK_SIZE "
+            "(2000) by default.",
+        )
+
+    def handle(self, *args, **options):
+        logger.info("Export %s", options["resource"])
+        resource = RESOURCES[options["resource"]]()
+        start = timeit.default_timer()
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as file:
+                rows = self.export(file, resource, options)
+        else:
+            rows = self.export(self.stdout, resource, options)
+        stop = timeit.default_timer()
+        self.stderr.write(
+            self.style.SUCCESS(
+                f"Exported {rows} {options['resource']} in {stop - start:.2f}s."
+            )
+        )
+
+    def export(self, file, resource, options):
+        return write_export(
+            file,
+            resource,
+            file_format=options["format"],
+            chunk_size=options["chunk_size"],
+        )
@@ -0,0 +1,31 @@
+import logging
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from sage_blog.models import PostCategory, PostTag, PostTagUsage
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized post counters of every category and tag, and "
+        "the daily tag usage, e.g. after bulk changes bypassing the model signals"
+    )
+
+    def handle(self, *args, **kwargs):
+        logger.info("Rebuild Post Counters")
+        start = timeit.default_timer()
+        with transaction.atomic():
+            categories = PostCategory.objects.refresh_post_counts()
+            tags = PostTag.objects.refresh_post_counts()
+            PostTagUsage.objects.refresh(PostTag.objects.values_list("pk", flat=True))
+        stop = timeit.default_timer()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed the post counters of {categories} categories and "
+                f"{tags} tags in {stop - start:.2f}s."
+            )
+        )
@@ -0,0 +1,79 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from sage_blog.search.mysql import create_full_text_indexes
+from sage_blog.search.postgres import (
+    create_localized_search_vectors,
+    create_search_vector,
+    create_trigram_indexes,
+    is_localized_search_enabled,
+)
+from sage_blog.search.sqlite import (
+    create_full_text_index,
+    is_full_text_search_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reinstall the search triggers and indexes (PostgreSQL search vectors and "
+        "trigram indexes, SQLite FTS5 table, MySQL FULLTEXT indexes) from the "
+        "current settings and reindex every post"
+    )
+
+    def handle(self, *args, **kwargs):
+        if connection.vendor == "sqlite":
+            self.rebuild_full_text_index()
+            return
+
+        if connection.vendor == "mysql":
+            self.rebuild_full_text_indexes()
+            return
+
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                self.style.WARNING(
+                    "Search indexes are only used on PostgreSQL, SQLite and MySQL."
+                )
+            )
+            return
+
+        logger.info("Rebuild Post Search Vectors")
+        with connection.schema_editor() as schema_editor:
+            create_search_vector(None, schema_editor)
+            create_localized_search_vectors(None, schema_editor)
+            create_trigram_indexes(None, schema_editor)
+
+        if is_localized_search_enabled():
+            self.stdout.write(self.style.SUCCESS("Search vectors rebuilt."))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Search vectors rebuilt, localized search vectors are disabled."
+                )
+            )
+
+    def rebuild_full_text_index(self):
+        logger.info("Rebuild Post Full-Text Index")
+        with connection.schema_editor() as schema_editor:
+            create_full_text_index(None, schema_editor)
+
+        if is_full_text_search_enabled():
+            self.stdout.write(self.style.SUCCESS("Full-text index rebuilt."))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Full-text index removed, FTS5 search is disabled or unavailable."
+                )
+            )
+
+    def rebuild_full_text_indexes(self):
+        logger.info("Rebuild Post FULLTEXT Indexes")
+        with connection.schema_editor() as schema_editor:
+            create_full_text_indexes(None, schema_editor)
+
+        self.stdout.write(self.style.SUCCESS("FULLTEXT indexes rebuilt."))
@@ -0,0 +1,27 @@
+import logging
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from sage_blog.models import PostTag
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the decayed trend score of every tag from the daily tag usage, "
+        "e.g. periodically to fold in bulk changes or after changing "
+        "SAGE_BLOG_TREND_HALF_LIFE"
+    )
+
+    def handle(self, *args, **kwargs):
+        logger.info("Refresh Trend Scores")
+        start = timeit.default_timer()
+        tags = PostTag.objects.refresh_trend_scores()
+        stop = timeit.default_timer()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed the trend scores of {tags} tags in {stop - start:.2f}s."
+            )
+        )
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:29
+
+from django.db import migrations
+from modeltranslation import settings as mt_settings
+from modeltranslation.utils import build_localized_fieldname
+
+import sage_blog.models.fields
+
+# The trigger SQL is frozen here rather than imported from
+# `sage_blog.search.postgres`, whose later versions write columns added by
+# later migrations.
+SEARCH_VECTOR_FUNCTION = "sage_post_search_vector_update"
+SEARCH_VECTOR_TRIGGER = "sage_post_search_vector_trigger"
+SEARCH_VECTOR_INDEX = "sage_post_search_vector_gin"
+
+SEARCHABLE_FIELDS = (("title", "A"), ("summary", "B"), ("description", "C"))
+
+
+def get_searchable_columns(field_name):
+    localized = build_localized_fieldname(field_name, mt_settings.DEFAULT_LANGUAGE)
+    return localized, field_name
+
+
+def get_search_vector_function_sql():
+    documents = []
+    for field_name, weight in SEARCHABLE_FIELDS:
+        localized, original = get_searchable_columns(field_name)
+        document = f"coalesce(nullif(NEW.{localized}, ''), NEW.{original}, '')"
+        if field_name == "description":
+            document = f"regexp_replace({document}, '<[^>]*>', ' ', 'g')"
+        documents.append(f"setweight(to_tsvector({document}), '{weight}')")
+
+    vector = "\n        || ".join(documents)
+    return f"""
+CREATE OR REPLACE FUNCTION {SEARCH_VECTOR_FUNCTION}() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        {vector};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def get_search_vector_trigger_sql():
+    columns = ", ".join(
+        column
+        for field_name, _weight in SEARCHABLE_FIELDS
+        for column in get_searchable_columns(field_name)
+    )
+    return f"""
+CREATE TRIGGER {SEARCH_VECTOR_TRIGGER}
+BEFORE INSERT OR UPDATE OF {columns} ON sage_post
+FOR EACH ROW EXECUTE FUNCTION {SEARCH_VECTOR_FUNCTION}();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(get_search_vector_function_sql())
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {SEARCH_VECTOR_TRIGGER} ON sage_post;"
+    )
+    schema_editor.execute(get_search_vector_trigger_sql())
+    # Touching an indexed column fires the trigger for rows that predate it.
+    schema_editor.execute("UPDATE sage_post SET title = title;")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX} "
+        "ON sage_post USING gin (search_vector);"
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_VECTOR_INDEX};")
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {SEARCH_VECTOR_TRIGGER} ON sage_post;"
+    )
+    schema_editor.execute(f"DROP FUNCTION IF EXISTS {SEARCH_VECTOR_FUNCTION}();")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0002_post_video"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=sage_blog.models.fields.SearchVectorField(
+                db_comment="Weighted tsvector of title, summary and description kept up to date by a trigger on PostgreSQL; unused on other database engines.",
+                editable=False,
+                help_text="Weighted full-text search document maintained by the database.",
+                null=True,
+                verbose_name="Search Vector",
+            ),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:32
+
+import django.db.models.deletion
+import sage_blog.models.fields
+from django.db import migrations, models
+
+# The localized search trigger writes one document per entry of `LANGUAGES`
+# with the text search configuration of `SAGE_BLOG_SEARCH_CONFIGS`, and is only
+# wanted with `SAGE_BLOG_LOCALIZED_SEARCH`. Those are settings, so this migration
+# only creates the table and its index, and the `rebuild_search_vectors` command
+# installs the trigger from the current settings.
+LOCALIZED_SEARCH_VECTOR_FUNCTION = "sage_post_localized_search_vector_update"
+LOCALIZED_SEARCH_VECTOR_TRIGGER = "sage_post_localized_search_vector_trigger"
+LOCALIZED_SEARCH_VECTOR_INDEX = "sage_post_localized_search_vector_gin"
+
+
+def create_localized_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {LOCALIZED_SEARCH_VECTOR_INDEX} "
+        "ON sage_post_search_vector USING gin (vector);"
+    )
+
+
+def drop_localized_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    # Installed by `rebuild_search_vectors`, it writes to the table removed next.
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {LOCALIZED_SEARCH_VECTOR_TRIGGER} ON sage_post;"
+    )
+    schema_editor.execute(
+        f"DROP FUNCTION IF EXISTS {LOCALIZED_SEARCH_VECTOR_FUNCTION}();"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0003_post_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostSearchVector",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "language",
+                    models.CharField(
+                        db_comment="Language code of the translated columns this document indexes.",
+                        max_length=15,
+                        verbose_name="Language",
+                    ),
+                ),
+                (
+                    "vector",
+                    sage_blog.models.fields.SearchVectorField(
+                        db_comment="Weighted tsvector built with the text search configuration of the language.",
+                        null=True,
+                        verbose_name="Search Vector",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        db_comment="The post this search document was built from.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_vectors",
+                        to="sage_blog.post",
+                        verbose_name="Post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Post Search Vector",
+                "verbose_name_plural": "Post Search Vectors",
+                "db_table": "sage_post_search_vector",
+                "db_table_comment": "Per-language full-text search documents of blog posts",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("post", "language"),
+                        name="sage_post_search_vector_unique_language",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            create_localized_search_index, drop_localized_search_trigger
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:36
+
+from django.db import migrations, models
+from modeltranslation import settings as mt_settings
+from modeltranslation.utils import build_localized_fieldname
+
+# The trigger function and trigram indexes are frozen here rather than imported
+# from `sage_blog.search.postgres`, so later changes to it do not alter this
+# migration. The trigger installed by 0003 is kept and calls the new function.
+# Only the columns of the default language are indexed, the
+# `rebuild_search_vectors` command indexes those of the other languages.
+SEARCH_VECTOR_FUNCTION = "sage_post_search_vector_update"
+
+SEARCHABLE_FIELDS = (("title", "A"), ("summary", "B"), ("description", "C"))
+SEARCH_EXCERPT_LENGTH = 500
+
+TRIGRAM_FIELDS = ("title", "summary")
+TRIGRAM_INDEX_SUFFIX = "_trgm"
+
+
+def get_column_sql(field_name):
+    localized = build_localized_fieldname(field_name, mt_settings.DEFAULT_LANGUAGE)
+    return f"coalesce(nullif(NEW.{localized}, ''), NEW.{field_name}, '')"
+
+
+def get_plain_text_sql(document):
+    return f"regexp_replace({document}, '<[^>]*>', ' ', 'g')"
+
+
+def get_search_vector_function_sql(with_excerpt):
+    documents = []
+    for field_name, weight in SEARCHABLE_FIELDS:
+        document = get_column_sql(field_name)
+        if field_name == "description":
+            document = get_plain_text_sql(document)
+        documents.append(f"setweight(to_tsvector({document}), '{weight}')")
+    vector = "\n        || ".join(documents)
+
+    excerpt = ""
+    if with_excerpt:
+        plain_text = get_plain_text_sql(get_column_sql("description"))
+        collapsed = f"btrim(regexp_replace({plain_text}, '\\s+', ' ', 'g'))"
+        excerpt = (
+            f"\n    NEW.search_excerpt := left({collapsed}, {SEARCH_EXCERPT_LENGTH});"
+        )
+    return f"""
+CREATE OR REPLACE FUNCTION {SEARCH_VECTOR_FUNCTION}() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        {vector};{excerpt}
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def create_search_excerpt(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(get_search_vector_function_sql(with_excerpt=True))
+    # Touching an indexed column fires the trigger for rows that predate it.
+    schema_editor.execute("UPDATE sage_post SET title = title;")
+
+
+def drop_search_excerpt(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    # Reinstall the function of 0003 before the column it writes is removed.
+    schema_editor.execute(get_search_vector_function_sql(with_excerpt=False))
+
+
+def get_trigram_columns():
+    columns = [
+        column
+        for field_name in TRIGRAM_FIELDS
+        for column in (
+            build_localized_fieldname(field_name, mt_settings.DEFAULT_LANGUAGE),
+            field_name,
+        )
+    ]
+    return [*columns, "search_excerpt"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    for column in get_trigram_columns():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS sage_post_{column}{TRIGRAM_INDEX_SUFFIX} "
+            f"ON sage_post USING gin ({column} gin_trgm_ops) "
+            f"WHERE {column} IS NOT NULL;"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    # Including the indexes of other languages added by `rebuild_search_vectors`.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'sage_post'")
+        existing = [name for (name,) in cursor.fetchall()]
+
+    for name in existing:
+        if name.endswith(TRIGRAM_INDEX_SUFFIX):
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0004_post_search_vector_languages"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_excerpt",
+            field=models.TextField(
+                db_comment="HTML-stripped excerpt of the description matched by trigram search, kept up to date by a trigger on PostgreSQL.",
+                editable=False,
+                help_text="Plain-text beginning of the description used by fuzzy search.",
+                null=True,
+                verbose_name="Search Excerpt",
+            ),
+        ),
+        migrations.RunPython(create_search_excerpt, drop_search_excerpt),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
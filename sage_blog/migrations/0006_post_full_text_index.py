@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.db import migrations
+from modeltranslation import settings as mt_settings
+from modeltranslation.utils import build_localized_fieldname
+
+# The FTS5 table and trigger SQL is frozen here rather than imported from
+# `sage_blog.search.sqlite`, so later changes to it do not alter this migration.
+# FTS5 search is opt-in, the index is only created when
+# `SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH` is enabled, otherwise the
+# `rebuild_search_vectors` command creates it once the setting is.
+FULL_TEXT_TABLE = "sage_post_fts"
+FULL_TEXT_INSERT_TRIGGER = "sage_post_fts_insert"
+FULL_TEXT_UPDATE_TRIGGER = "sage_post_fts_update"
+FULL_TEXT_DELETE_TRIGGER = "sage_post_fts_delete"
+
+SEARCHABLE_FIELDS = ("title", "summary", "description")
+
+
+def get_searchable_columns(field_name):
+    localized = build_localized_fieldname(field_name, mt_settings.DEFAULT_LANGUAGE)
+    return localized, field_name
+
+
+def get_values_sql(row):
+    values = []
+    for field_name in SEARCHABLE_FIELDS:
+        localized, original = get_searchable_columns(field_name)
+        values.append(f"coalesce(nullif({row}.{localized}, ''), {row}.{original}, '')")
+    return ", ".join(values)
+
+
+def get_trigger_sql():
+    columns = ", ".join(SEARCHABLE_FIELDS)
+    trigger_columns = ", ".join(
+        column
+        for field_name in SEARCHABLE_FIELDS
+        for column in get_searchable_columns(field_name)
+    )
+    insert = (
+        f"INSERT INTO {FULL_TEXT_TABLE} (rowid, {columns}) "
+        f"VALUES (NEW.id, {get_values_sql('NEW')});"
+    )
+    delete = f"DELETE FROM {FULL_TEXT_TABLE} WHERE rowid = OLD.id;"
+    return [
+        f"CREATE TRIGGER {FULL_TEXT_INSERT_TRIGGER} AFTER INSERT ON sage_post "
+        f"BEGIN {insert} END;",
+        f"CREATE TRIGGER {FULL_TEXT_UPDATE_TRIGGER} "
+        f"AFTER UPDATE OF id, {trigger_columns} ON sage_post "
+        f"BEGIN {delete} {insert} END;",
+        f"CREATE TRIGGER {FULL_TEXT_DELETE_TRIGGER} AFTER DELETE ON sage_post "
+        f"BEGIN {delete} END;",
+    ]
+
+
+def is_fts5_available(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(option == "ENABLE_FTS5" for (option,) in cursor.fetchall())
+
+
+def create_full_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    if not getattr(settings, "SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH", False):
+        return
+    if not is_fts5_available(schema_editor):
+        return
+
+    columns = ", ".join(SEARCHABLE_FIELDS)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FULL_TEXT_TABLE} USING fts5("
+        f"{columns}, tokenize = 'unicode61 remove_diacritics 2');"
+    )
+    for sql in get_trigger_sql():
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        f"INSERT INTO {FULL_TEXT_TABLE} (rowid, {columns}) "
+        f"SELECT sage_post.id, {get_values_sql('sage_post')} FROM sage_post;"
+    )
+
+
+def drop_full_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for trigger in (
+        FULL_TEXT_INSERT_TRIGGER,
+        FULL_TEXT_UPDATE_TRIGGER,
+        FULL_TEXT_DELETE_TRIGGER,
+    ):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FULL_TEXT_TABLE};")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0005_post_trigram_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_full_text_index, drop_full_text_index),
+    ]
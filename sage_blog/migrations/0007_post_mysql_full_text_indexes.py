@@ -0,0 +1,17 @@
+from django.db import migrations
+
+import sage_blog.search.mysql
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0006_post_full_text_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            sage_blog.search.mysql.create_full_text_indexes,
+            sage_blog.search.mysql.drop_full_text_indexes,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0007_post_mysql_full_text_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["category", "is_published", "published_at"],
+                name="sage_post_navigation_idx",
+            ),
+        ),
+    ]
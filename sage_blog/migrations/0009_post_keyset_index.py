@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0008_post_navigation_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["published_at", "id"], name="sage_post_keyset_idx"
+            ),
+        ),
+    ]
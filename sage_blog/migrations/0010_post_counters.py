@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:10
+
+from django.db import migrations, models
+from django.db.models import F, Func, OuterRef, Subquery
+
+
+def count(queryset):
+    # `COUNT()` without `GROUP BY` always returns a row, 0 when nothing matches.
+    return Subquery(
+        queryset.annotate(count=Func(F("pk"), function="COUNT")).values("count")
+    )
+
+
+def fill_post_counts(apps, schema_editor):
+    post = apps.get_model("sage_blog", "Post")
+    for model_name, field_name in (("PostCategory", "category"), ("PostTag", "tags")):
+        model = apps.get_model("sage_blog", model_name)
+        posts = post._base_manager.filter(**{field_name: OuterRef("pk")}).order_by()
+        model._base_manager.using(schema_editor.connection.alias).update(
+            post_count=count(posts),
+            published_post_count=count(posts.filter(is_published=True)),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0009_post_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postcategory",
+            name="post_count",
+            field=models.PositiveIntegerField(
+                db_comment="Denormalized number of posts of the category.",
+                default=0,
+                editable=False,
+                help_text="The number of posts in this category, maintained automatically.",
+                verbose_name="Post Count",
+            ),
+        ),
+        migrations.AddField(
+            model_name="postcategory",
+            name="published_post_count",
+            field=models.PositiveIntegerField(
+                db_comment="Denormalized number of published posts of the category.",
+                default=0,
+                editable=False,
+                help_text="The number of published posts in this category, maintained automatically.",
+                verbose_name="Published Post Count",
+            ),
+        ),
+        migrations.AddField(
+            model_name="posttag",
+            name="post_count",
+            field=models.PositiveIntegerField(
+                db_comment="Denormalized number of posts of the tag.",
+                default=0,
+                editable=False,
+                help_text="The number of posts in this tag, maintained automatically.",
+                verbose_name="Post Count",
+            ),
+        ),
+        migrations.AddField(
+            model_name="posttag",
+            name="published_post_count",
+            field=models.PositiveIntegerField(
+                db_comment="Denormalized number of published posts of the tag.",
+                default=0,
+                editable=False,
+                help_text="The number of published posts in this tag, maintained automatically.",
+                verbose_name="Published Post Count",
+            ),
+        ),
+        migrations.RunPython(fill_post_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def fill_tag_usage(apps, schema_editor):
+    usage = apps.get_model("sage_blog", "PostTagUsage")
+    tags = apps.get_model("sage_blog", "Post")._meta.get_field("tags")
+    post_name = tags.m2m_field_name()
+    tag_name = tags.m2m_reverse_field_name()
+    using = schema_editor.connection.alias
+    rows = (
+        tags.remote_field.through._base_manager.using(using)
+        .annotate(day=TruncDate(f"{post_name}__created_at"))
+        .values(tag_name, "day")
+        .annotate(
+            post_count=Count(post_name),
+            published_post_count=Count(
+                post_name, filter=Q(**{f"{post_name}__is_published": True})
+            ),
+        )
+        .order_by()
+    )
+    usage._base_manager.using(using).bulk_create(
+        (
+            usage(
+                tag_id=row[tag_name],
+                day=row["day"],
+                post_count=row["post_count"],
+                published_post_count=row["published_post_count"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0010_post_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostTagUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        db_comment="Creation day of the counted posts, in the current time zone.",
+                        verbose_name="Day",
+                    ),
+                ),
+                (
+                    "post_count",
+                    models.PositiveIntegerField(
+                        db_comment="Number of posts of the tag created on the day.",
+                        default=0,
+                        verbose_name="Post Count",
+                    ),
+                ),
+                (
+                    "published_post_count",
+                    models.PositiveIntegerField(
+                        db_comment="Number of published posts of the tag created on the day.",
+                        default=0,
+                        verbose_name="Published Post Count",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        db_comment="The tag whose posts are counted.",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usage",
+                        to="sage_blog.posttag",
+                        verbose_name="Tag",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Tag Usage",
+                "verbose_name_plural": "Tag Usage",
+                "db_table": "sage_post_tag_usage",
+                "db_table_comment": "Daily number of posts of each blog post tag",
+                "indexes": [
+                    models.Index(fields=["day"], name="sage_post_tag_usage_day_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("tag", "day"), name="sage_post_tag_usage_unique_day"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_tag_usage, migrations.RunPython.noop),
+    ]
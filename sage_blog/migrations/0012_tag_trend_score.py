@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:19
+
+import math
+from datetime import date
+from itertools import groupby
+
+from django.conf import settings
+from django.db import migrations, models
+
+TREND_EPOCH = date(2020, 1, 1)
+
+
+def get_trend_score(buckets):
+    # The base 2 logarithm of the decayed number of published posts, in
+    # half-lives since `TREND_EPOCH`.
+    half_life = getattr(settings, "SAGE_BLOG_TREND_HALF_LIFE", 7)
+    weights = [((day - TREND_EPOCH).days / half_life, count) for day, count in buckets]
+    peak = max(time for time, _count in weights)
+    total = sum(count * 2 ** (time - peak) for time, count in weights)
+    return peak + math.log2(total)
+
+
+def fill_trend_scores(apps, schema_editor):
+    tag = apps.get_model("sage_blog", "PostTag")
+    usage = apps.get_model("sage_blog", "PostTagUsage")
+    using = schema_editor.connection.alias
+    buckets = (
+        usage._base_manager.using(using)
+        .filter(published_post_count__gt=0)
+        .order_by("tag", "day")
+        .values_list("tag", "day", "published_post_count")
+    )
+    scores = [
+        tag(pk=tag_id, trend_score=get_trend_score((day, n) for _, day, n in rows))
+        for tag_id, rows in groupby(buckets.iterator(), key=lambda row: row[0])
+    ]
+    tag._base_manager.using(using).bulk_update(scores, ["trend_score"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sage_blog", "0011_post_tag_usage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="posttag",
+            name="trend_score",
+            field=models.FloatField(
+                db_comment="Base 2 logarithm of the decayed number of published posts of the tag, in half-lives since the trend epoch, null without published posts.",
+                editable=False,
+                help_text="The exponentially decayed number of recent published posts in this tag, maintained automatically.",
+                null=True,
+                verbose_name="Trend Score",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="posttag",
+            index=models.Index(
+                fields=["-trend_score", "-id"], name="sage_post_tag_trend_idx"
+            ),
+        ),
+        migrations.RunPython(fill_trend_scores, migrations.RunPython.noop),
+    ]
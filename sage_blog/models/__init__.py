@@ -1,4 +1,5 @@
 from .category import PostCategory
 from .faq import PostFaq
 from .post import Post
-from .tag import PostTag
+from .tag import PostTag, PostTagUsage
+from .search import PostSearchVector
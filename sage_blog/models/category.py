@@ -24,6 +24,24 @@ class PostCategory(TitleSlugMixin, TimeStampMixin):
         ),
     )
 
+    post_count = models.PositiveIntegerField(
+        _("Post Count"),
+        default=0,
+        editable=False,
+        help_text=_("The number of posts in this category, maintained automatically."),
+        db_comment="Denormalized number of posts of the category.",
+    )
+
+    published_post_count = models.PositiveIntegerField(
+        _("Published Post Count"),
+        default=0,
+        editable=False,
+        help_text=_(
+            "The number of published posts in this category, maintained automatically."
+        ),
+        db_comment="Denormalized number of published posts of the category.",
+    )
+
     objects: CategoryDataAccessLayer = CategoryDataAccessLayer()
 
     class Meta:
@@ -0,0 +1,17 @@
+from django.contrib.postgres.search import SearchVectorField as BaseSearchVectorField
+from django.db import models
+
+
+class SearchVectorField(BaseSearchVectorField):
+    """
+    A `tsvector` column that degrades gracefully on other database engines.
+
+    PostgreSQL stores a real `tsvector` that full-text lookups can use through a
+    GIN index. Other engines get a plain nullable text column so the model and its
+    migrations stay portable; the column is simply left empty there.
+    """
+
+    def db_type(self, connection):
+        if connection.vendor == "postgresql":
+            return super().db_type(connection)
+        return models.TextField().db_type(connection)
@@ -21,6 +21,7 @@ from sage_seo.models.mixins.seo import BlogDetailJsonLdMixin, SEOMixin
 from sage_tools.mixins.models.abstract import PictureOperationAbstract
 from sage_tools.mixins.models.base import TimeStampMixin, TitleSlugDescriptionMixin
 
+from sage_blog.models.fields import SearchVectorField
 from sage_blog.repository.managers import PostDataAccessLayer
 
 
@@ -146,6 +147,28 @@ class Post(
         help_text=_("Select posts related to this product."),
     )
 
+    search_vector = SearchVectorField(
+        _("Search Vector"),
+        null=True,
+        editable=False,
+        help_text=_("Weighted full-text search document maintained by the database."),
+        db_comment=(
+            "Weighted tsvector of title, summary and description kept up to date by "
+            "a trigger on PostgreSQL; unused on other database engines."
+        ),
+    )
+
+    search_excerpt = models.TextField(
+        _("Search Excerpt"),
+        null=True,
+        editable=False,
+        help_text=_("Plain-text beginning of the description used by fuzzy search."),
+        db_comment=(
+            "HTML-stripped excerpt of the description matched by trigram search, "
+            "kept up to date by a trigger on PostgreSQL."
+        ),
+    )
+
     objects: PostDataAccessLayer = PostDataAccessLayer()
 
     class Meta:
@@ -161,6 +184,16 @@ class Post(
         default_manager_name = "objects"
         db_table = "sage_post"
         db_table_comment = "Table for preserving blog posts"
+        indexes = [
+            # Serves the per-category `published_at` order of
+            # `PostQuerySet.annotate_navigation`.
+            models.Index(
+                fields=["category", "is_published", "published_at"],
+                name="sage_post_navigation_idx",
+            ),
+            # Serves the `(published_at, id)` seeks of keyset pagination.
+            models.Index(fields=["published_at", "id"], name="sage_post_keyset_idx"),
+        ]
 
     @property
     def reading_time(self):
@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from sage_blog.models.fields import SearchVectorField
+
+
+class PostSearchVector(models.Model):
+    """
+    Per-language full-text search document of a post.
+
+    Rows are written by a PostgreSQL trigger, one per configured language, using
+    the text search configuration matching that language. They are only used
+    when localized search is enabled with `SAGE_BLOG_LOCALIZED_SEARCH`.
+    """
+
+    post = models.ForeignKey(
+        "Post",
+        on_delete=models.CASCADE,
+        related_name="search_vectors",
+        verbose_name=_("Post"),
+        db_comment="The post this search document was built from.",
+    )
+
+    language = models.CharField(
+        _("Language"),
+        max_length=15,
+        db_comment="Language code of the translated columns this document indexes.",
+    )
+
+    vector = SearchVectorField(
+        _("Search Vector"),
+        null=True,
+        db_comment=(
+            "Weighted tsvector built with the text search configuration of the "
+            "language."
+        ),
+    )
+
+    class Meta:
+        verbose_name = _("Post Search Vector")
+        verbose_name_plural = _("Post Search Vectors")
+        db_table = "sage_post_search_vector"
+        db_table_comment = "Per-language full-text search documents of blog posts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("post", "language"),
+                name="sage_post_search_vector_unique_language",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} ({self.language})"
+
+    def __repr__(self):
+        return f"<Post Search Vector: {self.post_id} ({self.language})>"
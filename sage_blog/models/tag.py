@@ -2,7 +2,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from sage_tools.mixins.models.base import TimeStampMixin, TitleSlugMixin
 
-from sage_blog.repository.managers import TagDataAccessLayer
+from sage_blog.repository.managers import TagDataAccessLayer, TagUsageDataAccessLayer
 
 
 class PostTag(TitleSlugMixin, TimeStampMixin):
@@ -24,6 +24,38 @@ class PostTag(TitleSlugMixin, TimeStampMixin):
         ),
     )
 
+    post_count = models.PositiveIntegerField(
+        _("Post Count"),
+        default=0,
+        editable=False,
+        help_text=_("The number of posts in this tag, maintained automatically."),
+        db_comment="Denormalized number of posts of the tag.",
+    )
+
+    published_post_count = models.PositiveIntegerField(
+        _("Published Post Count"),
+        default=0,
+        editable=False,
+        help_text=_(
+            "The number of published posts in this tag, maintained automatically."
+        ),
+        db_comment="Denormalized number of published posts of the tag.",
+    )
+
+    trend_score = models.FloatField(
+        _("Trend Score"),
+        null=True,
+        editable=False,
+        help_text=_(
+            "The exponentially decayed number of recent published posts in this "
+            "tag, maintained automatically."
+        ),
+        db_comment=(
+            "Base 2 logarithm of the decayed number of published posts of the tag, "
+            "in half-lives since the trend epoch, null without published posts."
+        ),
+    )
+
     objects: TagDataAccessLayer = TagDataAccessLayer()
 
     class Meta:
@@ -36,9 +68,67 @@ class PostTag(TitleSlugMixin, TimeStampMixin):
         default_manager_name = "objects"
         db_table = "sage_post_tag"
         db_table_comment = "Table for preserving blog post tags"
+        indexes = [
+            models.Index(fields=["-trend_score", "-id"], name="sage_post_tag_trend_idx")
+        ]
 
     def __str__(self):
         return str(self.title)
 
     def __repr__(self):
         return f"<Post Tag: {self.title}>"
+
+
+class PostTagUsage(models.Model):
+    """
+    Daily rollup of the posts of a tag, by creation day of the posts.
+
+    Rows are refreshed by `sage_blog.signals.counters` when posts are created,
+    published or tagged, so trending tags sum a few buckets instead of counting
+    the whole tag-post relation.
+    """
+
+    tag = models.ForeignKey(
+        PostTag,
+        on_delete=models.CASCADE,
+        related_name="usage",
+        verbose_name=_("Tag"),
+        db_comment="The tag whose posts are counted.",
+    )
+
+    day = models.DateField(
+        _("Day"),
+        db_comment="Creation day of the counted posts, in the current time zone.",
+    )
+
+    post_count = models.PositiveIntegerField(
+        _("Post Count"),
+        default=0,
+        db_comment="Number of posts of the tag created on the day.",
+    )
+
+    published_post_count = models.PositiveIntegerField(
+        _("Published Post Count"),
+        default=0,
+        db_comment="Number of published posts of the tag created on the day.",
+    )
+
+    objects: TagUsageDataAccessLayer = TagUsageDataAccessLayer()
+
+    class Meta:
+        verbose_name = _("Tag Usage")
+        verbose_name_plural = _("Tag Usage")
+        db_table = "sage_post_tag_usage"
+        db_table_comment = "Daily number of posts of each blog post tag"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("tag", "day"), name="sage_post_tag_usage_unique_day"
+            )
+        ]
+        indexes = [models.Index(fields=["day"], name="sage_post_tag_usage_day_idx")]
+
+    def __str__(self):
+        return f"{self.tag_id} ({self.day})"
+
+    def __repr__(self):
+        return f"<Post Tag Usage: {self.tag_id} ({self.day})>"
@@ -0,0 +1,185 @@
+"""
+Denormalized post counters of categories and tags.
+
+`PostCategory` and `PostTag` store their `post_count` and
+`published_post_count` so listings read them off the row instead of joining and
+grouping posts, and `PostTagUsage` rolls the posts of each tag up by day for
+trending tags. The counters are refreshed by `sage_blog.signals.counters` when
+posts, their category or their tags change, by `PostQuerySet.update()` and
+`bulk_create()`, and rebuilt by the `rebuild_post_counts` management command.
+
+The buckets also give each tag an exponentially decayed `trend_score`, see
+`refresh_trend_scores`.
+"""
+
+import math
+from datetime import date
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, Func, OuterRef, Q, Subquery
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Post fields whose changes move posts between counters or usage buckets.
+COUNTED_POST_FIELDS = frozenset(
+    {"category", "category_id", "is_published", "created_at"}
+)
+
+# Trend scores count the half-lives elapsed since this day, see `get_trend_time`.
+TREND_EPOCH = date(2020, 1, 1)
+
+
+def get_usage_day(moment):
+    """
+    Returns the `PostTagUsage` day of a datetime, in the current time zone.
+    """
+    return timezone.localdate(moment) if timezone.is_aware(moment) else moment.date()
+
+
+def get_post_counts(model):
+    """
+    Returns the `update()` arguments recomputing the counters of a category or
+    tag model from its `posts` relation.
+
+    The counts are correlated subqueries over the post table only, which every
+    database, MySQL included, accepts in an `UPDATE` of the counted table.
+    """
+    relation = model._meta.get_field("posts")
+    posts = relation.related_model._base_manager.filter(
+        **{relation.field.name: OuterRef("pk")}
+    ).order_by()
+    return {
+        "post_count": count(posts),
+        "published_post_count": count(posts.filter(is_published=True)),
+    }
+
+
+def count(queryset):
+    # `COUNT()` without `GROUP BY` always returns a row, 0 when nothing matches.
+    return Subquery(
+        queryset.annotate(count=Func(F("pk"), function="COUNT")).values("count")
+    )
+
+
+def refresh_tag_usage(usage_model, tag_ids, days=None, using="default"):
+    """
+    Recomputes the `PostTagUsage` buckets of the given tags on the given days,
+    or on every day when `days` is None, from the tag-post relation.
+
+    Buckets are upserted so concurrent refreshes of a bucket do not conflict,
+    and buckets left without posts are deleted.
+    """
+    tag_ids = set(tag_ids)
+    if not tag_ids or days is not None and not days:
+        return
+
+    relation = usage_model._meta.get_field("tag").related_model._meta.get_field("posts")
+    post_name = relation.field.m2m_field_name()
+    tag_name = relation.field.m2m_reverse_field_name()
+    rows = (
+        relation.through._base_manager.using(using)
+        .filter(**{f"{tag_name}__in": tag_ids})
+        .annotate(day=TruncDate(f"{post_name}__created_at"))
+        .values(tag_name, "day")
+        .annotate(
+            post_count=Count(post_name),
+            published_post_count=Count(
+                post_name, filter=Q(**{f"{post_name}__is_published": True})
+            ),
+        )
+        .order_by()
+    )
+    stale = usage_model._base_manager.using(using).filter(tag__in=tag_ids)
+    if days is not None:
+        rows = rows.filter(day__in=days)
+        stale = stale.filter(day__in=days)
+
+    buckets = [
+        usage_model(
+            tag_id=row[tag_name],
+            day=row["day"],
+            post_count=row["post_count"],
+            published_post_count=row["published_post_count"],
+        )
+        for row in rows
+    ]
+    kept = {(bucket.tag_id, bucket.day) for bucket in buckets}
+    features = connections[using].features
+    with transaction.atomic(using=using, savepoint=False):
+        usage_model._base_manager.using(using).bulk_create(
+            buckets,
+            update_conflicts=True,
+            # MySQL upserts on any unique key and rejects an explicit target.
+            unique_fields=(
+                ["tag", "day"]
+                if features.supports_update_conflicts_with_target
+                else None
+            ),
+            update_fields=["post_count", "published_post_count"],
+        )
+        stale.filter(
+            pk__in=[
+                pk
+                for pk, tag_id, day in stale.values_list("pk", "tag", "day")
+                if (tag_id, day) not in kept
+            ]
+        ).delete()
+
+
+def get_trend_time(day):
+    """
+    Returns the number of half-lives from `TREND_EPOCH` to a day, the half-life
+    being `SAGE_BLOG_TREND_HALF_LIFE` days (7 by default).
+    """
+    half_life = getattr(settings, "SAGE_BLOG_TREND_HALF_LIFE", 7)
+    return (day - TREND_EPOCH).days / half_life
+
+
+def get_trend_score(buckets):
+    """
+    Returns the trend score of `(day, published_post_count)` buckets, or None
+    without published posts.
+
+    Each post weighs `2 ** -(age / half-life)`, so the decayed count of a tag on
+    a given day is `2 ** (trend_score - get_trend_time(day))`. Storing the
+    logarithm relative to a fixed epoch rather than the decayed count lets
+    scores keep their order as time passes, so they never need to be decayed
+    and posts only change the scores of their own tags.
+    """
+    weights = [(get_trend_time(day), count) for day, count in buckets if count]
+    if not weights:
+        return None
+    peak = max(time for time, _count in weights)
+    total = sum(count * 2 ** (time - peak) for time, count in weights)
+    return peak + math.log2(total)
+
+
+def refresh_trend_scores(tags, batch_size=500):
+    """
+    Recomputes the `trend_score` of a queryset of tags from their usage buckets
+    and returns the number of tags updated.
+    """
+    usage = tags.model._meta.get_field("usage").related_model
+    buckets = (
+        usage._base_manager.using(tags.db)
+        .filter(tag__in=tags.values("pk"), published_post_count__gt=0)
+        .order_by("tag", "day")
+        .values_list("tag", "day", "published_post_count")
+    )
+    scores = [
+        tags.model(
+            pk=tag_id,
+            trend_score=get_trend_score((day, count) for _, day, count in rows),
+        )
+        for tag_id, rows in groupby(
+            buckets.iterator(chunk_size=2000), key=lambda row: row[0]
+        )
+    ]
+    with transaction.atomic(using=tags.db, savepoint=False):
+        updated = tags.update(trend_score=None)
+        tags.model._base_manager.using(tags.db).bulk_update(
+            scores, ["trend_score"], batch_size=batch_size
+        )
+    return updated
@@ -1,3 +1,3 @@
 from .category import CategoryDataAccessLayer
 from .post import PostDataAccessLayer
-from .tag import TagDataAccessLayer
+from .tag import TagDataAccessLayer, TagUsageDataAccessLayer
@@ -21,10 +21,9 @@ class CategoryDataAccessLayer(Manager):
         """
         Annotates each category with the total number of posts in that category.
 
-        This method uses Django's Count aggregation function to count the number
-        of posts associated with each category. The resulting queryset will have
-        an additional attribute 'total_posts' for each category object, which
-        indicates the count of posts in that category.
+        The resulting queryset will have an additional attribute 'total_posts'
+        for each category object, which indicates the count of published posts
+        in that category, read from the denormalized `published_post_count`.
         """
         return self.get_queryset().annotate_total_posts()
 
@@ -60,3 +59,9 @@ class CategoryDataAccessLayer(Manager):
         If 'obj' is provided, it excludes that object from the results.
         """
         return self.get_queryset().filter_recent_categories(num_categories, obj)
+
+    def refresh_post_counts(self):
+        """
+        Recomputes the denormalized post counters of every category.
+        """
+        return self.get_queryset().refresh_post_counts()
@@ -30,6 +30,26 @@ class PostDataAccessLayer(Manager):
         """
         return self.get_queryset().filter_recent_posts(num_posts=num_posts, obj=obj)
 
+    def keyset_paginate(self, cursor=None, per_page=15):
+        """
+        Returns a `KeysetPage` of posts, newest first, addressed by an opaque
+        cursor instead of a page number.
+        """
+        return self.get_queryset().keyset_paginate(cursor, per_page)
+
+    def cached_count(self):
+        """
+        Returns the number of posts through a cache invalidated on post changes.
+        """
+        return self.get_queryset().cached_count()
+
+    def estimated_count(self):
+        """
+        Returns the PostgreSQL planner estimate of the number of posts, or their
+        cached count.
+        """
+        return self.get_queryset().estimated_count()
+
     def filter_by_category(self, category_slug):
         """
         Filters posts by a given category slug.
@@ -83,6 +103,27 @@ class PostDataAccessLayer(Manager):
         """
         return self.get_queryset().full_text_search(search_query)
 
+    def ranked_search(self, search_query, limit=None):
+        """
+        Performs a full-text search ordered by relevance, best matches first.
+        With `limit`, only the best `limit` posts are returned.
+        """
+        return self.get_queryset().ranked_search(search_query, limit)
+
+    def localized_search(self, search_query, language=None):
+        """
+        Performs a full-text search against the search document of a language,
+        using the active language unless `language` is given.
+        """
+        return self.get_queryset().localized_search(search_query, language)
+
+    def indexed_search(self, search_query):
+        """
+        Matches posts by full-text index, exact slug, and category or tag title,
+        without joins.
+        """
+        return self.get_queryset().indexed_search(search_query)
+
     def substring_search(self, search_query):
         """
         Performs a case-insensitive substring search in 'title' and 'description'
@@ -109,6 +150,20 @@ class PostDataAccessLayer(Manager):
         """
         return self.get_queryset().heavy_search(search_query)
 
+    def cached_heavy_search(self, search_query):
+        """
+        Performs `heavy_search` through a cache of the matching primary keys,
+        invalidated whenever a post changes.
+        """
+        return self.get_queryset().cached_heavy_search(search_query)
+
+    def plan_search(self, search_query):
+        """
+        Builds a single statement that evaluates the heavy search fallback chain
+        and tags each hit with the strategy that matched it.
+        """
+        return self.get_queryset().plan_search(search_query)
+
     def join_category(self):
         return self.get_queryset().join_category()
 
@@ -127,3 +182,17 @@ class PostDataAccessLayer(Manager):
         `next_post_slug` and `prev_post_slug`.
         """
         return self.get_queryset().annotate_next_and_prev()
+
+    def annotate_navigation(self):
+        """
+        Annotates each published post with the slug and title of the next and
+        previous published posts in the same category, ordered by `published_at`.
+        """
+        return self.get_queryset().annotate_navigation()
+
+    def get_navigation(self, post):
+        """
+        Returns the slug and title of the next and previous published posts around
+        `post` in its category.
+        """
+        return self.get_queryset().get_navigation(post)
@@ -2,6 +2,7 @@ from typing import Any, Optional
 
 from django.db.models import Manager, QuerySet
 
+from ..counters import refresh_tag_usage
 from ..queryset import TagQuerySet
 
 
@@ -75,6 +76,23 @@ class TagDataAccessLayer(Manager):
         """
         return self.get_queryset().filter_trend_tags(days_ago, min_count, limit)
 
+    def filter_top_published_tags(
+        self, limit: Optional[int] = None, min_count: int = 1, days_ago: int = 0
+    ) -> QuerySet:
+        """
+        Returns the published tags with the most published posts, annotated with
+        their number of published posts as `total_posts`.
+
+        Args:
+            `limit` (int, optional): The maximum number of tags to return. If None,
+                                    no limit is applied.
+            `min_count` (int): The minimum number of published posts of a tag.
+            `days_ago` (int): The number of days to look back, zero for all time.
+        """
+        return self.get_queryset().filter_top_published_tags(
+            limit, min_count, days_ago
+        )
+
     def annotate_total_posts(self) -> QuerySet:
         """
         Annotate tags with the total number of associated posts.
@@ -124,3 +142,35 @@ class TagDataAccessLayer(Manager):
         Prefetches related posts for each category in the queryset.
         """
         return self.get_queryset().filter_published_posts(is_published)
+
+    def refresh_post_counts(self):
+        """
+        Recomputes the denormalized post counters of every tag.
+        """
+        return self.get_queryset().refresh_post_counts()
+
+    def sort_by_trend_score(self) -> QuerySet:
+        """
+        Sorts tags with published posts by their decayed trend score, hottest
+        first.
+        """
+        return self.get_queryset().sort_by_trend_score()
+
+    def refresh_trend_scores(self):
+        """
+        Recomputes the decayed trend score of every tag.
+        """
+        return self.get_queryset().refresh_trend_scores()
+
+
+class TagUsageDataAccessLayer(Manager):
+    """
+    Tag Usage Data Access Layer
+    """
+
+    def refresh(self, tag_ids, days=None):
+        """
+        Recomputes the daily buckets of the given tags on the given days, or on
+        every day when `days` is None, from the tag-post relation.
+        """
+        refresh_tag_usage(self.model, tag_ids, days, using=self.db)
@@ -1,4 +1,6 @@
-from django.db.models import Count, Q, QuerySet
+from django.db.models import F, Q, QuerySet
+
+from sage_blog.repository.counters import get_post_counts
 
 
 class CategoryQuerySet(QuerySet):
@@ -10,14 +12,20 @@ class CategoryQuerySet(QuerySet):
         """
         Annotates each category with the total number of posts in that category.
 
-        This method uses Django's Count aggregation function to count the number
-        of posts associated with each category. The resulting queryset will have
-        an additional attribute 'total_posts' for each category object, which
-        indicates the count of posts in that category.
+        Only published categories with published posts are returned. The
+        resulting queryset will have an additional attribute 'total_posts' for
+        each category object, which indicates the count of published posts in
+        that category, read from the denormalized `published_post_count`.
         """
-        published_posts = self.filter_published_posts()
-        qs = published_posts.annotate(total_posts=Count("posts"))
-        return qs
+        qs = self.filter_published().filter(published_post_count__gt=0)
+        return qs.annotate(total_posts=F("published_post_count"))
+
+    def refresh_post_counts(self):
+        """
+        Recomputes the `post_count` and `published_post_count` of the categories
+        in the queryset, e.g. after bulk changes bypassing the signals.
+        """
+        return self.update(**get_post_counts(self.model))
 
     def filter_published(self, is_published: bool = True):
         """
@@ -1,23 +1,34 @@
 from datetime import timedelta
 
 from django.conf import settings
-from django.contrib.postgres.search import SearchQuery, SearchVector, TrigramSimilarity
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
 from django.db.models import (
     BooleanField,
     Case,
     Count,
+    Exists,
     ExpressionWrapper,
     F,
+    FloatField,
+    IntegerField,
     OuterRef,
     Q,
     QuerySet,
     Subquery,
     Value,
     When,
+    Window,
     fields,
 )
-from django.db.models.functions import Now
+from django.db.models.functions import Coalesce, Lag, Lead, Now, NullIf
 from django.utils import timezone
+from modeltranslation.utils import build_localized_fieldname, get_language
+
+from sage_blog.repository.counters import COUNTED_POST_FIELDS
+from sage_blog.search.backends import get_search_backend
+from sage_blog.utils.cache import get_cache, make_cache_key
+from sage_blog.utils.pagination import paginate_by_keyset
 
 
 class PostQuerySet(QuerySet):
@@ -30,6 +41,64 @@ class PostQuerySet(QuerySet):
     criteria and annotating posts with additional computed information.
     """
 
+    FULL_TEXT_STRATEGY = 1
+    SUBSTRING_STRATEGY = 2
+    TRIGRAM_STRATEGY = 3
+
+    SEARCH_CACHE_NAMESPACE = "post-search"
+    COUNT_CACHE_NAMESPACE = "post-count"
+
+    def update(self, **kwargs):
+        """
+        Updates the posts, refreshing the post counters and usage buckets of the
+        categories and tags they leave or join when `category`, `is_published`
+        or `created_at` change.
+        """
+        if not COUNTED_POST_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            post_ids, category_ids = set(), set()
+            for post_id, category_id in self.values_list("pk", "category"):
+                post_ids.add(post_id)
+                category_ids.add(category_id)
+            rows = super().update(**kwargs)
+            self._refresh_post_counts(post_ids, category_ids)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Creates the posts, refreshing the post counters of their categories.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            self._refresh_post_counts((), {obj.category_id for obj in objs})
+        return objs
+
+    def _refresh_post_counts(self, post_ids, category_ids):
+        categories = self.model._meta.get_field("category").related_model
+        tags = self.model._meta.get_field("tags").related_model
+        usage = tags._meta.get_field("usage").related_model
+        category_ids = set(category_ids)
+        if post_ids:
+            category_ids.update(
+                self.model._base_manager.using(self.db)
+                .filter(pk__in=post_ids)
+                .values_list("category", flat=True)
+            )
+            tag_ids = set(
+                tags.objects.using(self.db)
+                .filter(posts__in=post_ids)
+                .values_list("pk", flat=True)
+            )
+            tag_queryset = tags.objects.using(self.db).filter(pk__in=tag_ids)
+            tag_queryset.refresh_post_counts()
+            usage.objects.db_manager(self.db).refresh(tag_ids)
+            tag_queryset.refresh_trend_scores()
+        categories.objects.using(self.db).filter(
+            pk__in=category_ids
+        ).refresh_post_counts()
+
     def filter_actives(self, is_published=True):
         """
         Returns a queryset of posts filtered by their active status.
@@ -48,6 +117,65 @@ class PostQuerySet(QuerySet):
 
         return queryset[:num_posts]
 
+    def keyset_paginate(self, cursor=None, per_page=15):
+        """
+        Returns a `KeysetPage` of posts, newest first, seeking past the
+        `(published_at, id)` encoded in `cursor` instead of counting and offsetting
+        rows. Pass the `next_cursor` or `previous_cursor` of a page to move to
+        its neighbours.
+        """
+        return paginate_by_keyset(self, cursor, per_page)
+
+    def cached_count(self):
+        """
+        Returns the number of posts in the queryset through a cache keyed by its
+        filters, kept for `SAGE_BLOG_COUNT_CACHE_TIMEOUT` seconds (300 by default)
+        and invalidated whenever a post or its tags change.
+        """
+        try:
+            filters = str(self.order_by().query)
+        except EmptyResultSet:
+            return 0
+
+        cache = get_cache()
+        key = make_cache_key(self.COUNT_CACHE_NAMESPACE, filters)
+        count = cache.get(key)
+        if count is None:
+            count = self.count()
+            cache.set(
+                key, count, getattr(settings, "SAGE_BLOG_COUNT_CACHE_TIMEOUT", 300)
+            )
+        return count
+
+    def estimated_count(self):
+        """
+        Returns the planner estimate of the number of posts on PostgreSQL when the
+        queryset is unfiltered, falling back to `cached_count` otherwise.
+
+        Estimates below `SAGE_BLOG_COUNT_ESTIMATE_THRESHOLD` (1000 by default) are
+        not trusted, as small tables are cheap to count exactly and may not have
+        been analyzed yet.
+        """
+        connection = connections[self.db]
+        is_unfiltered = not (
+            self.query.where
+            or self.query.is_sliced
+            or self.query.distinct
+            or self.query.combinator
+            or len(self.query.alias_map) > 1
+        )
+        if connection.vendor == "postgresql" and is_unfiltered:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [self.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            threshold = getattr(settings, "SAGE_BLOG_COUNT_ESTIMATE_THRESHOLD", 1000)
+            if row and row[0] >= threshold:
+                return row[0]
+        return self.cached_count()
+
     def filter_by_category(self, category_slug):
         """
         Filters posts by a given category slug.
@@ -135,31 +263,157 @@ class PostQuerySet(QuerySet):
             prev_post_slug=Subquery(prev_post_slug),
         )
 
+    def annotate_navigation(self):
+        """
+        Annotates each published post with the slug and title of the next and
+        previous published posts in the same category.
+
+        Unlike `annotate_next_and_prev`, posts follow their `published_at` order
+        and the neighbours come from `LEAD`/`LAG` window functions computed in the
+        same scan, partitioned by category, instead of two correlated subqueries
+        per row. The added fields are `next_post_slug`, `next_post_title`,
+        `prev_post_slug` and `prev_post_title`.
+        """
+        title = self._get_localized_title()
+        window = {
+            "partition_by": [F("category")],
+            "order_by": [F("published_at").asc(), F("pk").asc()],
+        }
+        return self.filter_actives().annotate(
+            next_post_slug=Window(Lead("slug"), **window),
+            next_post_title=Window(Lead(title), **window),
+            prev_post_slug=Window(Lag("slug"), **window),
+            prev_post_title=Window(Lag(title), **window),
+        )
+
+    def get_navigation(self, post):
+        """
+        Returns the next and previous published posts around `post` in its
+        category, by `published_at`, as
+        `{"next": {"slug": ..., "title": ...} or None, "prev": ...}`.
+
+        A single post needs no window over its whole category: each neighbour is
+        one seek on the `(category, is_published, published_at)` index, and the
+        four lookups are sent as one query.
+        """
+        siblings = (
+            self.filter_actives()
+            .filter(category=post.category_id)
+            .annotate(navigation_title=self._get_localized_title())
+        )
+        after = Q(published_at__gt=post.published_at) | Q(
+            published_at=post.published_at, pk__gt=post.pk
+        )
+        neighbours = {
+            "next": siblings.filter(after).order_by("published_at", "pk"),
+            "prev": siblings.exclude(after)
+            .exclude(pk=post.pk)
+            .order_by("-published_at", "-pk"),
+        }
+        annotations = {}
+        for direction, queryset in neighbours.items():
+            annotations[f"{direction}_slug"] = Subquery(queryset.values("slug")[:1])
+            annotations[f"{direction}_title"] = Subquery(
+                queryset.values("navigation_title")[:1]
+            )
+        row = (
+            self.model._base_manager.filter(pk=post.pk)
+            .annotate(**annotations)
+            .values(*annotations)
+            .first()
+        ) or dict.fromkeys(annotations)
+        return {
+            direction: (
+                {"slug": row[f"{direction}_slug"], "title": row[f"{direction}_title"]}
+                if row[f"{direction}_slug"] is not None
+                else None
+            )
+            for direction in neighbours
+        }
+
+    def _get_localized_title(self):
+        # Expressions are not rewritten by django-modeltranslation, so read the
+        # active language column and fall back to the original one.
+        return Coalesce(
+            NullIf(F(build_localized_fieldname("title", get_language())), Value("")),
+            F("title"),
+        )
+
     def full_text_search(self, search_query):
         """
         Performs a full-text search on 'title' and 'description' fields of the posts.
         This method is optimized for finding complete words or phrases, not partial
         substrings.
+
+        The matching is delegated to the configured search backend (see
+        `sage_blog.search.backends`). On PostgreSQL the lookup runs against the
+        stored `search_vector` column, a weighted document of the title, summary
+        and HTML-stripped description that is kept current by a database trigger
+        and served from a GIN index. With `SAGE_BLOG_LOCALIZED_SEARCH` enabled the
+        document of the active language is used.
+
+        With SQLite FTS5 search enabled the words are matched through the
+        `sage_post_fts` index, and on MySQL and MariaDB through the FULLTEXT index
+        of the active language in natural language mode. Posts are then annotated
+        with their relevance as `rank`, best matches first.
         """
-        database_engine = settings.DATABASES["default"]["ENGINE"]
-        if search_query:
-            if "postgresql" in database_engine:
-                vector = SearchVector("title", "description")
-                query = SearchQuery(search_query)
-                return self.annotate(search=vector).filter(search=query)
-
-            elif "mysql" in database_engine or "mariadb" in database_engine:
-                return self.filter(
-                    Q(title__icontains=search_query)
-                    | Q(description__icontains=search_query)
-                )
+        if not search_query:
+            return self
 
-            elif "sqlite" in database_engine:
-                return self.filter(
-                    Q(title__icontains=search_query)
-                    | Q(description__icontains=search_query)
-                )
-        return self
+        backend = get_search_backend()
+        condition = backend.full_text_condition(self, search_query)
+        if condition is None:
+            return self
+
+        queryset = self.filter(condition)
+        rank = backend.full_text_rank(self, search_query)
+        if backend.ranks_full_text_search and rank is not None:
+            queryset = queryset.annotate(rank=rank).order_by("-rank")
+        return queryset
+
+    def ranked_search(self, search_query, limit=None):
+        """
+        Performs a full-text search ordered by relevance, best matches first, and
+        annotates each post with its `rank`.
+
+        On PostgreSQL the rank is the cover density ranking (`ts_rank_cd`) of the
+        stored search document, weighted so title matches outrank summary matches,
+        which outrank description matches. Other backends rank with their own
+        index as in `full_text_search`, or return the unranked matches.
+
+        With `limit`, only the best `limit` posts are returned. The database then
+        keeps a bounded top-k heap instead of sorting every match, and the first
+        page can be served without counting all matches.
+        """
+        if not search_query:
+            return self[:limit] if limit else self
+
+        backend = get_search_backend()
+        queryset = self.filter(backend.full_text_condition(self, search_query))
+        rank = backend.search_rank(self, search_query)
+        if rank is not None:
+            queryset = queryset.annotate(rank=rank).order_by("-rank", "-pk")
+        return queryset[:limit] if limit else queryset
+
+    def localized_search(self, search_query, language=None):
+        """
+        Performs a full-text search against the search document of a language.
+
+        Each configured language has its own weighted document built with the
+        matching PostgreSQL text search configuration (e.g. `arabic`, `english`),
+        so stemming follows the language being searched. The active language is
+        used unless `language` is given. On other database engines this falls
+        back to `full_text_search`.
+        """
+        if not search_query:
+            return self
+
+        condition = get_search_backend().localized_condition(
+            self, search_query, language
+        )
+        if condition is None:
+            return self.full_text_search(search_query)
+        return self.filter(condition)
 
     def substring_search(self, search_query):
         """
@@ -169,8 +423,7 @@ class PostQuerySet(QuerySet):
         """
         if search_query:
             return self.filter(
-                Q(title__icontains=search_query)
-                | Q(description__icontains=search_query)
+                get_search_backend().substring_condition(self, search_query)
             )
         return self
 
@@ -180,35 +433,29 @@ class PostQuerySet(QuerySet):
         of the posts.
         This method supports partial word matches and is more linguistically aware than
         a simple substring search, but it requires pg_trgm extension for Postgresql.
-        """
-        database_engine = settings.DATABASES["default"]["ENGINE"]
-
-        if "postgresql" in database_engine:
-            return (
-                self.annotate(
-                    similarity=TrigramSimilarity("title", search_query)
-                    + TrigramSimilarity("description", search_query)
-                )
-                .filter(similarity__gt=0.1)
-                .order_by("-similarity")
-            )
-
-        elif "mysql" in database_engine or "mariadb" in database_engine:
-            # MariaDB does not support trigram similarity directly
-            # Mysql does not support trigram similarity directly
-            return self.filter(
-                Q(title__icontains=search_query)
-                | Q(description__icontains=search_query)
-            )
-
-        elif "sqlite" in database_engine:
-            # SQLite does not support trigram similarity directly
-            return self.filter(
-                Q(title__icontains=search_query)
-                | Q(description__icontains=search_query)
-            )
 
-        return self.none()
+        On PostgreSQL the title is matched with the `%` and `<%` operators and the
+        summary and the plain-text `search_excerpt` of the description with `<%`.
+        Those operators compare against the session's `pg_trgm` thresholds
+        (see `SAGE_BLOG_TRIGRAM_SIMILARITY_THRESHOLD` and
+        `SAGE_BLOG_TRIGRAM_WORD_SIMILARITY_THRESHOLD`), so the `gin_trgm_ops`
+        indexes can serve the filter. Similarity is only computed for matches to
+        order them.
+
+        On MySQL and MariaDB every word is matched as a prefix against the
+        FULLTEXT index of the active language in boolean mode, and matches are
+        ordered by their relevance, annotated as `similarity`.
+        """
+        backend = get_search_backend()
+        condition = backend.trigram_condition(self, search_query)
+        if condition is None:
+            return self.none()
+
+        queryset = self.filter(condition)
+        similarity = backend.trigram_similarity(self, search_query)
+        if similarity is not None:
+            queryset = queryset.annotate(similarity=similarity).order_by("-similarity")
+        return queryset
 
     def heavy_search(self, search_query):
         """
@@ -216,26 +463,196 @@ class PostQuerySet(QuerySet):
         provide a comprehensive search experience. The method first tries a full-text
         search. If it yields no results, it falls back to a substring search. If
         available and suitable, it also uses trigram similarity for nuanced matching.
+
+        The fallback chain is planned into a single lazily evaluated statement, so
+        nothing is sent to the database until the queryset is consumed. Each
+        matching post is annotated with `search_strategy`, one of the
+        `*_STRATEGY` constants, telling which strategy produced the hit.
+
+        With SQLite FTS5 search enabled, and on MySQL and MariaDB, full-text hits
+        are ordered by their relevance, annotated as `rank`. Trigram hits are
+        ordered by their similarity like in `trigram_similarity_search`, also
+        annotated as `rank`. Only one strategy is kept per search, so ranks are
+        never compared across strategies.
+        """
+        if not search_query:
+            return self
+
+        queryset = self.plan_search(search_query)
+        backend = get_search_backend()
+        ranks = []
+        full_text_rank = backend.full_text_rank(self, search_query)
+        if backend.ranks_full_text_search and full_text_rank is not None:
+            ranks.append(
+                When(search_strategy=self.FULL_TEXT_STRATEGY, then=full_text_rank)
+            )
+        similarity = backend.trigram_similarity(self, search_query)
+        if similarity is not None:
+            ranks.append(When(search_strategy=self.TRIGRAM_STRATEGY, then=similarity))
+        if ranks:
+            rank = Case(*ranks, output_field=FloatField())
+            queryset = queryset.annotate(rank=rank).order_by(
+                F("rank").desc(nulls_last=True)
+            )
+        return queryset
+
+    def cached_heavy_search(self, search_query):
+        """
+        Performs `heavy_search` through a cache of the matching primary keys.
+
+        Results are cached per normalized query, active language and queryset
+        filters (e.g. published posts only) for `SAGE_BLOG_SEARCH_CACHE_TIMEOUT`
+        seconds, so a popular search costs a single `pk__in` fetch. Entries are
+        invalidated by bumping the `SEARCH_CACHE_NAMESPACE` generation whenever a
+        post or its tags change. Searches matching more than
+        `SAGE_BLOG_SEARCH_CACHE_MAX_RESULTS` posts are not cached.
+
+        Posts keep the order and the `search_strategy` annotation of
+        `heavy_search`.
         """
+        search_query = " ".join(search_query.lower().split())
         if not search_query:
             return self
 
-        # Step 1: Full-text search
-        full_text_qs = self.full_text_search(search_query)
-        if full_text_qs.exists():
-            return full_text_qs
+        try:
+            filters = str(self.query)
+        except EmptyResultSet:
+            return self
+
+        cache = get_cache()
+        key = make_cache_key(
+            self.SEARCH_CACHE_NAMESPACE, search_query, get_language(), filters
+        )
+        hits = cache.get(key)
+        if hits is None:
+            max_results = getattr(settings, "SAGE_BLOG_SEARCH_CACHE_MAX_RESULTS", 500)
+            hits = list(
+                self.heavy_search(search_query).values_list("pk", "search_strategy")[
+                    : max_results + 1
+                ]
+            )
+            # `False` remembers that the search is too broad to be cached.
+            hits = hits if len(hits) <= max_results else False
+            cache.set(
+                key, hits, getattr(settings, "SAGE_BLOG_SEARCH_CACHE_TIMEOUT", 300)
+            )
+
+        if hits is False:
+            return self.heavy_search(search_query)
+        if not hits:
+            return self.none()
+
+        return (
+            self.filter(pk__in=[pk for pk, _strategy in hits])
+            .annotate(
+                search_strategy=Case(
+                    *(When(pk=pk, then=Value(strategy)) for pk, strategy in hits),
+                    output_field=IntegerField(),
+                ),
+                search_position=Case(
+                    *(
+                        When(pk=pk, then=Value(position))
+                        for position, (pk, _strategy) in enumerate(hits)
+                    ),
+                    output_field=IntegerField(),
+                ),
+            )
+            .order_by("search_position")
+        )
+
+    def indexed_search(self, search_query):
+        """
+        Matches posts through indexes only, for searches over many posts such as
+        the admin changelist.
 
-        # Step 2: Substring search
-        substring_qs = self.substring_search(search_query)
-        if substring_qs.exists():
-            return substring_qs
+        Posts match when the full-text or title condition of the search backend
+        does, when their slug is the search query, or when the title of their
+        category or of one of their tags contains it. The title condition keeps
+        partial words matching, through the trigram index on PostgreSQL.
+        Categories and tags are matched first and posts are then filtered by
+        their keys, so no join multiplies the rows and no `DISTINCT` is needed.
+        """
+        if not search_query:
+            return self
 
-        # Step 3: Trigram similarity search (if supported by the database)
-        trigram_qs = self.trigram_similarity_search(search_query)
-        if trigram_qs.exists():
-            return trigram_qs
+        backend = get_search_backend()
+        condition = backend.full_text_condition(self, search_query)
+        if condition is None:
+            condition = backend.substring_condition(self, search_query)
+
+        category = self.model._meta.get_field("category").related_model
+        tags = self.model._meta.get_field("tags")
+        through = tags.remote_field.through
+        category_ids = list(
+            category.objects.using(self.db)
+            .filter(title__icontains=search_query)
+            .values_list("pk", flat=True)
+        )
+        tag_ids = list(
+            tags.related_model.objects.using(self.db)
+            .filter(title__icontains=search_query)
+            .values_list("pk", flat=True)
+        )
+        tagged_posts = (
+            through.objects.using(self.db)
+            .filter(**{f"{tags.m2m_reverse_field_name()}__in": tag_ids})
+            .values(tags.m2m_field_name())
+        )
+        return self.filter(
+            condition
+            | backend.title_condition(self, search_query)
+            | Q(slug=search_query)
+            | Q(category__in=category_ids)
+            | Q(pk__in=tagged_posts)
+        )
 
-        return self.none()
+    def plan_search(self, search_query):
+        """
+        Builds a single statement that evaluates the heavy search fallback chain.
+
+        Every candidate row is tagged with the cheapest strategy it matches, while
+        an uncorrelated `CASE WHEN EXISTS (...)` picks the first strategy that has
+        any hit at all. The database evaluates those probes once per statement
+        and stops at the first matching row, which replaces the `exists()` round
+        trips the cascade used to issue before fetching the results.
+        """
+        backend = get_search_backend()
+        tiers = []
+        for strategy, condition in (
+            (
+                self.FULL_TEXT_STRATEGY,
+                backend.full_text_condition(self, search_query),
+            ),
+            (
+                self.SUBSTRING_STRATEGY,
+                backend.substring_condition(self, search_query),
+            ),
+            (
+                self.TRIGRAM_STRATEGY,
+                backend.trigram_condition(self, search_query),
+            ),
+        ):
+            # Backends without a dedicated implementation reuse the substring
+            # condition, probing it more than once would only repeat the work.
+            if condition is None or any(condition == seen for _, seen in tiers):
+                continue
+            tiers.append((strategy, condition))
+
+        candidates = self.order_by()
+        matched_strategy = Case(
+            *(When(condition, then=Value(strategy)) for strategy, condition in tiers),
+            output_field=IntegerField(),
+        )
+        chosen_strategy = Case(
+            *(
+                When(Exists(candidates.filter(condition)), then=Value(strategy))
+                for strategy, condition in tiers
+            ),
+            output_field=IntegerField(),
+        )
+        return self.annotate(search_strategy=matched_strategy).filter(
+            search_strategy=chosen_strategy
+        )
 
     def join_category(self):
         """
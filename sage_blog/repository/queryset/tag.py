@@ -1,8 +1,16 @@
 from datetime import timedelta
 
-from django.db.models import Count, Max, Q, QuerySet
+from django.db.models import F, Max, OuterRef, Q, QuerySet, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Power
 from django.utils import timezone
 
+from sage_blog.repository.counters import (
+    get_post_counts,
+    get_trend_time,
+    get_usage_day,
+    refresh_trend_scores,
+)
+
 
 class TagQuerySet(QuerySet):
     """
@@ -47,7 +55,8 @@ class TagQuerySet(QuerySet):
         - If 'days_ago' is zero, it identifies trending tags regardless of the time
         frame, ranking them by their total usage count in posts.
         - If 'days_ago' is greater than zero, it filters tags used more than 'min_count'
-        times in the specified number of days before the current date.
+        times in the specified number of days before the current date, summing
+        the daily buckets of `PostTagUsage` from the day 'days_ago' days ago.
 
         An optional 'limit' parameter allows controlling the maximum number of tags
         returned.
@@ -84,16 +93,22 @@ class TagQuerySet(QuerySet):
 
         if days_ago == 0:
             qs = (
-                self.annotate(total_count=Count("posts"))
+                self.annotate(total_count=F("post_count"))
                 .filter(total_count__gte=min_count)
                 .order_by("-total_count")
             )
         else:
-            recent_date = timezone.now() - timedelta(days=days_ago)
+            recent_day = get_usage_day(timezone.now()) - timedelta(days=days_ago)
+            usage = self.model._meta.get_field("usage").related_model
+            recent_count = (
+                usage.objects.filter(tag=OuterRef("pk"), day__gte=recent_day)
+                .order_by()
+                .values("tag")
+                .annotate(total=Sum("post_count"))
+                .values("total")
+            )
             qs = self.annotate(
-                recent_count=Count(
-                    "posts", filter=Q(posts__created_at__gte=recent_date)
-                )
+                recent_count=Coalesce(Subquery(recent_count), Value(0))
             ).filter(recent_count__gte=min_count)
 
         if limit is not None:
@@ -105,13 +120,49 @@ class TagQuerySet(QuerySet):
         """
         Annotates each tag with the total number of posts in that tag.
 
-        This method uses Django's Count aggregation function to count the number
-        of posts associated with each tag. The resulting queryset will have
-        an additional attribute 'total_posts' for each tag object, which
-        indicates the count of posts in that tag.
+        Only published tags with published posts are returned. The resulting
+        queryset will have an additional attribute 'total_posts' for each tag
+        object, which indicates the count of published posts in that tag, read
+        from the denormalized `published_post_count`.
+        """
+        qs = self.filter_published().filter(published_post_count__gt=0)
+        return qs.annotate(total_posts=F("published_post_count"))
+
+    def filter_top_published_tags(self, limit=None, min_count=1, days_ago=0):
+        """
+        Returns the published tags with the most published posts, annotated
+        with their number of published posts as 'total_posts', for the sidebar.
+
+        If 'days_ago' is zero, all posts count and tags are read off their
+        denormalized `published_post_count` without any join. Otherwise only
+        posts created since the start of the day 'days_ago' days ago count,
+        summed from the daily usage buckets in a single grouped join.
+
+        Args:
+            limit (int, optional): The maximum number of tags to return. If None,
+                                    no limit is applied.
+            min_count (int): The minimum number of published posts of a tag.
+            days_ago (int): The number of days to look back, zero for all time.
         """
-        published_posts = self.filter_published_posts()
-        qs = published_posts.annotate(total_posts=Count("posts"))
+        if not isinstance(days_ago, int) or days_ago < 0:
+            raise ValueError("`days_ago` must be a non-negative integer")
+
+        if not isinstance(min_count, int) or min_count <= 0:
+            raise ValueError("`min_count` must be a positive integer")
+
+        qs = self.filter_published()
+        if days_ago == 0:
+            qs = qs.annotate(total_posts=F("published_post_count"))
+        else:
+            recent_day = get_usage_day(timezone.now()) - timedelta(days=days_ago)
+            qs = qs.filter(usage__day__gte=recent_day).annotate(
+                total_posts=Sum("usage__published_post_count")
+            )
+        qs = qs.filter(total_posts__gte=min_count).order_by("-total_posts", "pk")
+
+        if limit is not None:
+            qs = qs[:limit]
+
         return qs
 
     def filter_published(self, is_published: bool = True):
@@ -156,7 +207,7 @@ class TagQuerySet(QuerySet):
         Sorts tags based on the number of posts associated with each, in descending
         order.
         """
-        qs = self.annotate(posts_count=Count("posts")).order_by("-posts_count")
+        qs = self.annotate(posts_count=F("post_count")).order_by("-posts_count")
         return qs
 
     def filter_by_post_date_range(self, start_date, end_date) -> QuerySet:
@@ -164,3 +215,32 @@ class TagQuerySet(QuerySet):
         Filters tags based on the publication date range of the associated posts.
         """
         return self.filter(posts__created_at__range=(start_date, end_date)).distinct()
+
+    def refresh_post_counts(self):
+        """
+        Recomputes the `post_count` and `published_post_count` of the tags in the
+        queryset, e.g. after bulk changes bypassing the signals.
+        """
+        return self.update(**get_post_counts(self.model))
+
+    def sort_by_trend_score(self) -> QuerySet:
+        """
+        Sorts tags with published posts by their decayed trend score, hottest
+        first, reading the `trend_score` index so the top tags are found
+        without scanning posts.
+
+        The resulting queryset has an additional attribute 'trending_score'
+        holding the decayed number of recent published posts of each tag.
+        """
+        now = get_trend_time(get_usage_day(timezone.now()))
+        qs = self.filter(trend_score__isnull=False).order_by("-trend_score", "-pk")
+        return qs.annotate(
+            trending_score=Power(Value(2.0), F("trend_score") - Value(now))
+        )
+
+    def refresh_trend_scores(self):
+        """
+        Recomputes the `trend_score` of the tags in the queryset from their
+        daily usage buckets.
+        """
+        return refresh_trend_scores(self)
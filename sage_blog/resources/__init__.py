@@ -1,4 +1,4 @@
 from .category import PostCategoryResource
-from .post import PostResource
+from .post import PostBulkResource, PostResource
 from .tag import PostTagResource
 from .faq import PostFaqResource
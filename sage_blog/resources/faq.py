@@ -1,3 +1,4 @@
+from django.db.models import Prefetch
 from import_export import fields, resources
 from import_export.widgets import ForeignKeyWidget
 
@@ -19,6 +20,12 @@ class PostFaqResource(resources.ModelResource):
     def get_error_result_class(cls):
         return DataProcessingError
 
+    def filter_export(self, queryset, **kwargs):
+        # Load the titles of the posts of each chunk at once, not their content.
+        return queryset.prefetch_related(
+            Prefetch("post", queryset=Post.objects.only("title"))
+        )
+
     class Meta:
         model = PostFaq
         base_language_fields = ["question", "answer"]
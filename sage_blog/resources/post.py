@@ -1,9 +1,28 @@
+from copy import copy
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils.text import slugify
 from import_export import fields, resources
+from import_export.instance_loaders import CachedInstanceLoader
 from import_export.widgets import ForeignKeyWidget, ManyToManyWidget
 
+from sage_blog.utils.cache import SIDEBAR_CACHE_NAMESPACE, bump_generation
 from sage_blog.utils.import_export.errors import DataProcessingError
 from sage_blog.utils.import_export.exclude_fields import get_language_specific_fields
-from sage_blog.models import PostCategory, PostTag, Post
+from sage_blog.utils.import_export.widget import (
+    CachedForeignKeyWidget,
+    CachedLookupMixin,
+    CachedManyToManyWidget,
+)
+from sage_blog.models import PostCategory, PostTag, PostTagUsage, Post
+from sage_blog.repository.queryset import PostQuerySet
+from sage_blog.search.typeahead import TYPEAHEAD_CACHE_NAMESPACE
+
+# Attribute holding the many-to-many values of a post until its batch is saved.
+IMPORTED_M2M = "_imported_m2m"
 
 
 class PostResource(resources.ModelResource):
@@ -24,8 +43,196 @@ class PostResource(resources.ModelResource):
     def get_error_result_class(cls):
         return DataProcessingError
 
+    def filter_export(self, queryset, **kwargs):
+        # Exports are read in chunks, each joining categories and authors and
+        # loading the tags and linked posts of the chunk at once instead of
+        # running queries per post.
+        return queryset.select_related("category", "author").prefetch_related(
+            Prefetch("tags", queryset=PostTag.objects.only("title")),
+            Prefetch("suggested_posts", queryset=Post.objects.only("pk")),
+            Prefetch("related_posts", queryset=Post.objects.only("pk")),
+        )
+
     class Meta:
         model = Post
         base_language_fields = ["title", "summary", "description"]
-        exclude = ("id",) + get_language_specific_fields(Post, base_language_fields)
+        exclude = (
+            "id",
+            "search_vector",
+            "search_excerpt",
+        ) + get_language_specific_fields(Post, base_language_fields)
         import_id_fields = ("title",)
+
+
+class PostBulkResource(PostResource):
+    """
+    `PostResource` importing posts in batches of `SAGE_BLOG_IMPORT_BATCH_SIZE`
+    rows (1000 by default) for large imports.
+
+    Existing posts are loaded once per import, categories and tags are resolved
+    from title maps loaded once, posts are saved with `bulk_create` and
+    `bulk_update`, and the tag relation of each batch is replaced with a single
+    bulk insert. Model signals are not sent: the post counters, tag usage and
+    trend scores and the caches are refreshed once after the import. With the
+    `inverted_index` search backend, run `build_search_index` afterwards.
+    """
+
+    category = fields.Field(
+        column_name="category",
+        attribute="category",
+        widget=CachedForeignKeyWidget(PostCategory, "title"),
+    )
+
+    tags = fields.Field(
+        column_name="tags",
+        attribute="tags",
+        widget=CachedManyToManyWidget(PostTag, field="title", separator=";"),
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Read per resource so settings changes apply, on a copy of the options
+        # shared by the class.
+        self._meta = copy(self._meta)
+        self._meta.batch_size = getattr(settings, "SAGE_BLOG_IMPORT_BATCH_SIZE", 1000)
+        self.tag_ids = set()
+        self.slugs = {}
+
+    def before_import(self, dataset, **kwargs):
+        super().before_import(dataset, **kwargs)
+        self.tag_ids.clear()
+        self.slugs = dict(Post.objects.values_list("slug", "pk"))
+        for field in self.fields.values():
+            if isinstance(field.widget, CachedLookupMixin):
+                field.widget.clear_cache()
+
+    def get_m2m_fields(self):
+        return [
+            field
+            for field in self.get_import_fields()
+            if isinstance(field.widget, ManyToManyWidget) and not field.readonly
+        ]
+
+    def get_bulk_update_fields(self):
+        m2m_fields = {field.attribute for field in self.get_m2m_fields()}
+        return [
+            name
+            for name in super().get_bulk_update_fields()
+            if self.fields[name].attribute not in m2m_fields
+        ]
+
+    def before_save_instance(self, instance, row, **kwargs):
+        super().before_save_instance(instance, row, **kwargs)
+        self.set_unique_slug(instance)
+        # Many-to-many values are saved once the batch of the post is saved.
+        setattr(
+            instance,
+            IMPORTED_M2M,
+            {
+                field.attribute: field.clean(row, **kwargs)
+                for field in self.get_m2m_fields()
+                if field.column_name in row
+            },
+        )
+
+    def set_unique_slug(self, instance):
+        """
+        Slugifies the title like `TitleSlugMixin.save()`, which bulk saves skip,
+        checking uniqueness against the slugs loaded before the import.
+        """
+        if not getattr(settings, "AUTO_SLUGIFY_ENABLED", True):
+            return
+        owner = instance.pk or id(instance)
+        base_slug = slugify(instance.title, allow_unicode=True)
+        slug, counter = base_slug, 1
+        while self.slugs.setdefault(slug, owner) != owner:
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+        instance.slug = slug
+
+    def bulk_create(self, using_transactions, dry_run, *args, **kwargs):
+        instances = list(self.create_instances)
+        super().bulk_create(using_transactions, dry_run, *args, **kwargs)
+        if using_transactions or not dry_run:
+            self.save_m2m_in_bulk(instances)
+
+    def bulk_update(self, using_transactions, dry_run, *args, **kwargs):
+        instances = list(self.update_instances)
+        super().bulk_update(using_transactions, dry_run, *args, **kwargs)
+        if using_transactions or not dry_run:
+            self.save_m2m_in_bulk(instances)
+
+    def save_m2m_in_bulk(self, instances):
+        """
+        Replaces the many-to-many relations of a saved batch of posts by
+        deleting and bulk inserting the rows of their through tables.
+        """
+        instances = [obj for obj in instances if hasattr(obj, IMPORTED_M2M)]
+        # MySQL does not return the keys of bulk created rows.
+        missing = {obj.title: obj for obj in instances if obj.pk is None}
+        if missing:
+            for title, pk in Post.objects.filter(title__in=missing).values_list(
+                "title", "pk"
+            ):
+                missing[title].pk = pk
+        instances = [obj for obj in instances if obj.pk is not None]
+
+        for model_field in Post._meta.many_to_many:
+            rows = [
+                (obj, getattr(obj, IMPORTED_M2M)[model_field.name])
+                for obj in instances
+                if model_field.name in getattr(obj, IMPORTED_M2M)
+            ]
+            if not rows:
+                continue
+            if model_field.remote_field.symmetrical:
+                # Symmetrical relations store both directions, leave them to
+                # the related manager.
+                for obj, values in rows:
+                    getattr(obj, model_field.name).set(values)
+                continue
+
+            through = model_field.remote_field.through
+            source = through._meta.get_field(model_field.m2m_field_name())
+            target = through._meta.get_field(model_field.m2m_reverse_field_name())
+            old_rows = through.objects.filter(
+                **{f"{source.name}__in": [obj.pk for obj, _values in rows]}
+            )
+            if model_field.name == "tags":
+                self.tag_ids.update(old_rows.values_list(target.attname, flat=True))
+                self.tag_ids.update(
+                    value.pk for _obj, values in rows for value in values
+                )
+            old_rows.delete()
+            through.objects.bulk_create(
+                [
+                    through(**{source.attname: obj.pk, target.attname: value.pk})
+                    for obj, values in rows
+                    for value in values
+                ],
+                batch_size=self._meta.batch_size,
+            )
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        if self._is_dry_run(kwargs) and not self._is_using_transactions(kwargs):
+            return
+
+        # Posts may have moved between categories, which are few.
+        PostCategory.objects.refresh_post_counts()
+        tags = PostTag.objects.filter(pk__in=self.tag_ids)
+        tags.refresh_post_counts()
+        PostTagUsage.objects.refresh(self.tag_ids)
+        tags.refresh_trend_scores()
+        for namespace in (
+            PostQuerySet.SEARCH_CACHE_NAMESPACE,
+            PostQuerySet.COUNT_CACHE_NAMESPACE,
+            TYPEAHEAD_CACHE_NAMESPACE,
+            SIDEBAR_CACHE_NAMESPACE,
+        ):
+            transaction.on_commit(partial(bump_generation, namespace))
+
+    class Meta(PostResource.Meta):
+        use_bulk = True
+        skip_diff = True
+        instance_loader_class = CachedInstanceLoader
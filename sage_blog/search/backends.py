@@ -0,0 +1,448 @@
+"""
+Search backends used by `PostQuerySet`.
+
+A backend turns search queries into filter conditions and relevance
+expressions for one search engine. The backend is chosen once, when the app
+registry is ready, from the `SAGE_BLOG_SEARCH_BACKEND` setting: either an alias
+of `SEARCH_BACKENDS` or the dotted path of a `BaseSearchBackend` subclass. When
+unset, the backend matching the default database is used.
+"""
+
+import heapq
+import os
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramSimilar, TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from modeltranslation.utils import build_localized_fieldname, get_language
+
+from sage_blog.search import mysql, sqlite
+from sage_blog.search.inverted_index import (
+    DeltaLog,
+    InvertedIndex,
+    MappedInvertedIndex,
+    OverlaidInvertedIndex,
+    get_delta_log_path,
+    get_post_word_weights,
+)
+from sage_blog.search.postgres import get_search_config, is_localized_search_enabled
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+SEARCH_BACKENDS = {
+    "postgresql": "sage_blog.search.backends.PostgresSearchBackend",
+    "sqlite": "sage_blog.search.backends.SQLiteSearchBackend",
+    "mysql": "sage_blog.search.backends.MySQLSearchBackend",
+    "inverted_index": "sage_blog.search.backends.InvertedIndexSearchBackend",
+    "substring": "sage_blog.search.backends.SubstringSearchBackend",
+}
+
+_search_backend = None
+
+
+class BaseSearchBackend:
+    """
+    Builds the conditions and expressions behind the `PostQuerySet` search
+    methods.
+
+    Conditions are `Q` objects or boolean expressions, and `None` disables a
+    strategy. Relevance expressions are `None` when the backend does not rank.
+    """
+
+    # Whether `full_text_search` orders its results by `full_text_rank`.
+    ranks_full_text_search = True
+
+    def full_text_condition(self, queryset, search_query):
+        return self.substring_condition(queryset, search_query)
+
+    def localized_condition(self, queryset, search_query, language=None):
+        return None
+
+    def substring_condition(self, queryset, search_query):
+        return Q(title__icontains=search_query) | Q(description__icontains=search_query)
+
+    def title_condition(self, queryset, search_query):
+        return Q(title__icontains=search_query)
+
+    def trigram_condition(self, queryset, search_query):
+        return self.substring_condition(queryset, search_query)
+
+    def full_text_rank(self, queryset, search_query):
+        return None
+
+    def search_rank(self, queryset, search_query):
+        return self.full_text_rank(queryset, search_query)
+
+    def trigram_similarity(self, queryset, search_query):
+        return None
+
+    def index_post(self, post):
+        """
+        Called after a post is saved, for backends keeping their own index.
+        """
+
+    def remove_post(self, post):
+        """
+        Called after a post is deleted, for backends keeping their own index.
+        """
+
+
+class SubstringSearchBackend(BaseSearchBackend):
+    """
+    Case-insensitive `LIKE` matching, available on every database.
+    """
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search on the stored `search_vector` documents and trigram search
+    with the `pg_trgm` operators, see `sage_blog.search.postgres`.
+    """
+
+    # Ranking is opt-in through `ranked_search`, `ts_rank_cd` reads every match.
+    ranks_full_text_search = False
+
+    # `SearchRank` weights of the D, C, B and A labels of the search documents,
+    # i.e. title (A) over summary (B) over description (C).
+    rank_weights = [0.1, 0.2, 0.4, 1.0]
+
+    def __init__(self):
+        self.localized = is_localized_search_enabled()
+
+    def full_text_condition(self, queryset, search_query):
+        if self.localized:
+            return self.localized_condition(queryset, search_query)
+        # `search_vector` is stored and GIN indexed, see `sage_blog.search`
+        return Q(search_vector=SearchQuery(search_query))
+
+    def localized_condition(self, queryset, search_query, language=None):
+        language = language or get_language()
+        search_vectors = queryset.model._meta.get_field("search_vectors").related_model
+        query = SearchQuery(search_query, config=get_search_config(language))
+        return Exists(
+            search_vectors.objects.filter(
+                post=OuterRef("pk"), language=language, vector=query
+            )
+        )
+
+    def trigram_condition(self, queryset, search_query):
+        # Lookup expressions are not rewritten by django-modeltranslation, so
+        # target the active language columns that carry the indexes.
+        title = F(build_localized_fieldname("title", get_language()))
+        summary = F(build_localized_fieldname("summary", get_language()))
+        return (
+            Q(TrigramSimilar(title, search_query))
+            | Q(TrigramWordSimilar(title, search_query))
+            | Q(TrigramWordSimilar(summary, search_query))
+            | Q(TrigramWordSimilar(F("search_excerpt"), search_query))
+        )
+
+    def title_condition(self, queryset, search_query):
+        # Matches parts of words through the trigram index of the title column
+        title = F(build_localized_fieldname("title", get_language()))
+        return Q(TrigramWordSimilar(title, search_query))
+
+    def search_rank(self, queryset, search_query):
+        if self.localized:
+            language = get_language()
+            search_vectors = queryset.model._meta.get_field(
+                "search_vectors"
+            ).related_model
+            query = SearchQuery(search_query, config=get_search_config(language))
+            ranks = search_vectors.objects.filter(
+                post=OuterRef("pk"), language=language
+            ).annotate(
+                rank=SearchRank(
+                    F("vector"), query, weights=self.rank_weights, cover_density=True
+                )
+            )
+            return Subquery(ranks.values("rank")[:1])
+
+        return SearchRank(
+            F("search_vector"),
+            SearchQuery(search_query),
+            weights=self.rank_weights,
+            cover_density=True,
+        )
+
+    def trigram_similarity(self, queryset, search_query):
+        return TrigramWordSimilarity(
+            search_query, build_localized_fieldname("title", get_language())
+        ) + TrigramWordSimilarity(search_query, "search_excerpt")
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Full-text search through the `sage_post_fts` FTS5 table ranked by `bm25()`,
+    see `sage_blog.search.sqlite`.
+    """
+
+    def full_text_condition(self, queryset, search_query):
+        match_expression = sqlite.get_match_expression(search_query)
+        if not match_expression:
+            return self.substring_condition(queryset, search_query)
+        # `sage_post_fts` is maintained by triggers, see `sage_blog.search`
+        return Q(pk__in=RawSQL(sqlite.get_match_sql(), (match_expression,)))
+
+    def full_text_rank(self, queryset, search_query):
+        match_expression = sqlite.get_match_expression(search_query)
+        if not match_expression:
+            return None
+        return sqlite.FullTextRank(match_expression)
+
+
+class MySQLSearchBackend(BaseSearchBackend):
+    """
+    `MATCH ... AGAINST` search on the FULLTEXT index of the active language,
+    see `sage_blog.search.mysql`.
+    """
+
+    def full_text_condition(self, queryset, search_query):
+        return Q(mysql.get_match_condition(get_language(), search_query))
+
+    def trigram_condition(self, queryset, search_query):
+        prefix_query = mysql.get_prefix_query(search_query)
+        if not prefix_query:
+            return self.substring_condition(queryset, search_query)
+        # The closest indexed approximation of fuzzy matching on MySQL.
+        return Q(mysql.get_match_condition(get_language(), prefix_query, boolean=True))
+
+    def full_text_rank(self, queryset, search_query):
+        return mysql.MatchAgainst(
+            *mysql.get_full_text_columns(get_language()), search_query=search_query
+        )
+
+    def trigram_similarity(self, queryset, search_query):
+        prefix_query = mysql.get_prefix_query(search_query)
+        if not prefix_query:
+            return None
+        return mysql.MatchAgainst(
+            *mysql.get_full_text_columns(get_language()),
+            search_query=prefix_query,
+            boolean=True,
+        )
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    """
+    Matches words against an `InvertedIndex`, so the database only fetches the
+    matching posts by primary key.
+
+    Without `SAGE_BLOG_SEARCH_INDEX_PATH` every process builds its own index in
+    memory on first use. With it, the index file is memory-mapped at startup,
+    built by the `build_search_index` management command or on the first search,
+    and processes remap it when it changes. Once the transaction commits, a post
+    saved or deleted is appended to the `DeltaLog` of the file, which every
+    process replays over the mapped index before searching. Rebuilding the index
+    merges the log, run `build_search_index` periodically to keep it short.
+
+    Writes bypassing `save()` and `delete()`, such as `QuerySet.update()`, are
+    only picked up when the index is rebuilt.
+
+    Matching posts are passed to the database by primary key, along with their
+    scores. Only the best `SAGE_BLOG_SEARCH_MAX_CANDIDATES` matches (250 by
+    default) are kept, so queries on common words stay within the parameter
+    limits of the database.
+    """
+
+    def __init__(self, path=None, max_candidates=None):
+        self.path = path or getattr(settings, "SAGE_BLOG_SEARCH_INDEX_PATH", None)
+        self.max_candidates = max_candidates or getattr(
+            settings, "SAGE_BLOG_SEARCH_MAX_CANDIDATES", 250
+        )
+        self.index = InvertedIndex()
+        self.mapped_index = None
+        self.delta_log = None
+        self._overlaid_index = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        if self.path:
+            self.delta_log = DeltaLog(get_delta_log_path(self.path))
+            if os.path.exists(self.path):
+                self.mapped_index = MappedInvertedIndex(self.path)
+
+    def get_index(self, queryset):
+        if self.path:
+            return self.get_mapped_index(queryset.model)
+        if not self.index.is_built:
+            self.index.build(queryset.model._base_manager.all())
+        return self.index
+
+    def get_mapped_index(self, model):
+        """
+        Returns the mapped index file with the changes of its log applied.
+        """
+        with self._lock:
+            if self.mapped_index is None or self.mapped_index.is_stale():
+                if not os.path.exists(self.path):
+                    self.build(model)
+                # The previous map is closed once no search holds it anymore.
+                self.mapped_index = MappedInvertedIndex(self.path)
+                self._overlaid_index = None
+            if self.delta_log.refresh() or self._overlaid_index is None:
+                self._overlaid_index = OverlaidInvertedIndex(
+                    self.mapped_index, self.delta_log
+                )
+            return self._overlaid_index
+
+    def build(self, model):
+        """
+        Indexes every post, writing the index file and merging its log when a
+        path is configured.
+        """
+        index = InvertedIndex()
+        if not self.path:
+            index.build(model._base_manager.all())
+            self.index = index
+            return index
+
+        # Changes logged before the posts are read are part of the new file.
+        log_path = get_delta_log_path(self.path)
+        offset = DeltaLog.get_size(log_path)
+        index.build(model._base_manager.all())
+        with self._lock_file():
+            index.save(self.path)
+            DeltaLog.truncate(log_path, offset)
+        return index
+
+    def get_scores(self, queryset, search_query):
+        """
+        Returns `{post_id: score}` for the best posts containing every word of
+        the query.
+        """
+        return self._get_candidates(self.get_index(queryset).search(search_query))
+
+    def get_prefix_scores(self, queryset, search_query):
+        """
+        Returns `{post_id: score}` for the best posts containing a word starting
+        with any word of the query.
+        """
+        scores = self.get_index(queryset).prefix_search(search_query)
+        return self._get_candidates(scores)
+
+    def full_text_condition(self, queryset, search_query):
+        return Q(pk__in=sorted(self.get_scores(queryset, search_query)))
+
+    def trigram_condition(self, queryset, search_query):
+        return Q(pk__in=sorted(self.get_prefix_scores(queryset, search_query)))
+
+    def full_text_rank(self, queryset, search_query):
+        return self._get_score(self.get_scores(queryset, search_query))
+
+    def trigram_similarity(self, queryset, search_query):
+        return self._get_score(self.get_prefix_scores(queryset, search_query))
+
+    def index_post(self, post):
+        if self.path:
+            weights = get_post_word_weights(post)
+            transaction.on_commit(partial(self._log_change, post.pk, weights))
+        elif self.index.is_built:
+            self.index.index_post(post)
+
+    def remove_post(self, post):
+        if self.path:
+            transaction.on_commit(partial(self._log_change, post.pk, None))
+        elif self.index.is_built:
+            self.index.remove_post(post.pk)
+
+    def _log_change(self, post_id, weights):
+        with self._lock_file():
+            DeltaLog.append(get_delta_log_path(self.path), post_id, weights)
+
+    @contextmanager
+    def _lock_file(self):
+        """
+        Serializes index file writes between the threads and processes of a
+        host.
+        """
+        with self._write_lock, open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _get_candidates(self, scores):
+        if len(scores) <= self.max_candidates:
+            return scores
+        # Ties favour the most recent posts.
+        return dict(
+            heapq.nlargest(
+                self.max_candidates,
+                scores.items(),
+                key=lambda item: (item[1], item[0]),
+            )
+        )
+
+    def _get_score(self, scores):
+        if not scores:
+            return None
+        return Case(
+            *(When(pk=post_id, then=Value(score)) for post_id, score in scores.items()),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+
+
+def get_default_search_backend_name():
+    vendor = connections[DEFAULT_DB_ALIAS].vendor
+    if vendor == "postgresql":
+        return "postgresql"
+    if vendor == "sqlite" and sqlite.is_full_text_search_enabled():
+        return "sqlite"
+    if vendor == "mysql" and mysql.is_full_text_search_enabled():
+        return "mysql"
+    return "substring"
+
+
+def load_search_backend(name):
+    """
+    Instantiates the search backend registered under `name` or found at the
+    dotted path `name`.
+    """
+    path = SEARCH_BACKENDS.get(name, name)
+    try:
+        backend_class = import_string(path)
+    except ImportError as error:
+        raise ImproperlyConfigured(
+            f"SAGE_BLOG_SEARCH_BACKEND refers to unknown search backend {name!r}."
+        ) from error
+    return backend_class()
+
+
+def configure_search_backend():
+    """
+    Selects the search backend from the settings, called when the app is ready
+    and whenever a search setting changes.
+    """
+    global _search_backend
+    name = getattr(settings, "SAGE_BLOG_SEARCH_BACKEND", None)
+    _search_backend = load_search_backend(name or get_default_search_backend_name())
+    return _search_backend
+
+
+def get_search_backend():
+    return _search_backend or configure_search_backend()
@@ -0,0 +1,573 @@
+"""
+An in-process inverted index of posts.
+
+It maps every word of the searchable fields to the posts containing it, so
+words are looked up in a dictionary instead of being matched by the database.
+The index is either kept in the memory of each process, built from the database
+on first use, or persisted to a compact file that every process memory-maps.
+
+The file holds a header, the sorted ids of the indexed posts, a table of the
+sorted words pointing into a UTF-8 blob and into the postings, and the
+postings themselves as `(post_id, weight)` pairs. Words are found by binary
+search over the mapped table, so opening an index neither parses nor copies it.
+
+The file is never rewritten to apply a single change. Posts saved or deleted
+since it was built are appended to a `DeltaLog` next to it, one JSON line per
+post, which every process replays on top of the mapped file. Building the index
+again merges the log into the file.
+"""
+
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.utils.html import strip_tags
+
+from sage_blog.search.postgres import SEARCHABLE_FIELDS, get_searchable_columns
+
+# Field weights matching `PostgresSearchBackend.rank_weights` for the A, B and
+# C labels of `SEARCHABLE_FIELDS`.
+FIELD_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}
+
+WORD_PATTERN = re.compile(r"\w+")
+
+INDEX_MAGIC = b"SBII"
+INDEX_VERSION = 1
+# magic, version, document count, word count, size of the words blob
+HEADER = struct.Struct("<4sIIII")
+DOCUMENT = struct.Struct("<q")
+# offset and length of the word in the blob, first posting and posting count
+WORD = struct.Struct("<IIII")
+POSTING = struct.Struct("<qf")
+
+
+def tokenize(text):
+    return WORD_PATTERN.findall(strip_tags(text or "").lower())
+
+
+def get_document_columns():
+    return [
+        get_searchable_columns(field_name) for field_name, _weight in SEARCHABLE_FIELDS
+    ]
+
+
+def get_word_weights(values, columns=None):
+    """
+    Returns `{word: weight}` for the searchable fields of a post, given the
+    `values` of its columns. A weight sums the field weights of every
+    occurrence of the word, so a title hit counts more than a description hit.
+    """
+    columns = columns or get_document_columns()
+    weights = defaultdict(float)
+    for (_field_name, weight), (localized, original) in zip(SEARCHABLE_FIELDS, columns):
+        for word in tokenize(values.get(localized) or values.get(original)):
+            weights[word] += FIELD_WEIGHTS[weight]
+    return dict(weights)
+
+
+def get_post_word_weights(post):
+    columns = get_document_columns()
+    values = {name: getattr(post, name, None) for pair in columns for name in pair}
+    return get_word_weights(values, columns)
+
+
+class BaseInvertedIndex(ABC):
+    """
+    Scores posts against the postings of an index.
+
+    Subclasses provide `document_count`, `get_posting(word)` returning
+    `{post_id: weight}` and `get_prefix_entries(prefix)` yielding the
+    `(word, posting)` of every word starting with `prefix`.
+    """
+
+    document_count = 0
+
+    @abstractmethod
+    def get_posting(self, word):
+        pass
+
+    @abstractmethod
+    def get_prefix_entries(self, prefix):
+        pass
+
+    def get_prefix_postings(self, prefix):
+        for _word, posting in self.get_prefix_entries(prefix):
+            yield posting
+
+    def search(self, search_query):
+        """
+        Returns `{post_id: score}` for posts containing every word of the query.
+        """
+        words = tokenize(search_query)
+        if not words:
+            return {}
+
+        postings = sorted((self.get_posting(word) for word in words), key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            matches.intersection_update(posting)
+        return {
+            post_id: sum(self._score(posting, post_id) for posting in postings)
+            for post_id in matches
+        }
+
+    def prefix_search(self, search_query):
+        """
+        Returns `{post_id: score}` for posts containing a word starting with any
+        word of the query.
+        """
+        scores = defaultdict(float)
+        for prefix in set(tokenize(search_query)):
+            for posting in self.get_prefix_postings(prefix):
+                for post_id in posting:
+                    scores[post_id] += self._score(posting, post_id)
+        return dict(scores)
+
+    def _score(self, posting, post_id):
+        inverse_frequency = math.log(1 + self.document_count / len(posting))
+        return posting[post_id] * inverse_frequency
+
+
+class InvertedIndex(BaseInvertedIndex):
+    """
+    A mutable index held in memory.
+
+    Changes are guarded by a lock as the index is shared by the threads of a
+    process.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.is_built = False
+        self._words = None
+        self._lock = threading.RLock()
+
+    @property
+    def document_count(self):
+        return len(self.documents)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads an index file written by `save` into a mutable index.
+        """
+        index = cls()
+        with MappedInvertedIndex(path) as mapped:
+            words = {}
+            for position in range(mapped.word_count):
+                word, posting = mapped.get_entry(position)
+                index.postings[word] = posting
+                for post_id in posting:
+                    words.setdefault(post_id, set()).add(word)
+            index.documents = {
+                post_id: words.get(post_id, set()) for post_id in mapped.documents()
+            }
+        index.is_built = True
+        return index
+
+    def build(self, queryset):
+        """
+        Indexes every post of `queryset`, replacing the current content.
+        """
+        columns = get_document_columns()
+        names = [name for pair in columns for name in pair]
+        with self._lock:
+            self.postings = defaultdict(dict)
+            self.documents = {}
+            for row in queryset.values_list("pk", *names).iterator():
+                values = dict(zip(names, row[1:]))
+                self._add(row[0], get_word_weights(values, columns))
+            self._words = None
+            self.is_built = True
+
+    def save(self, path):
+        """
+        Writes the index to `path`, atomically replacing the previous file so
+        processes mapping it keep a consistent view.
+        """
+        with self._lock:
+            words = self._get_sorted_words()
+            blob = bytearray()
+            table = bytearray()
+            postings = bytearray()
+            posting_count = 0
+            for word in words:
+                encoded = word.encode()
+                posting = self.postings[word]
+                table += WORD.pack(len(blob), len(encoded), posting_count, len(posting))
+                blob += encoded
+                for post_id, weight in sorted(posting.items()):
+                    postings += POSTING.pack(post_id, weight)
+                posting_count += len(posting)
+            documents = b"".join(
+                DOCUMENT.pack(post_id) for post_id in sorted(self.documents)
+            )
+            header = HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION, len(self.documents), len(words), len(blob)
+            )
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                for section in (header, documents, table, blob, postings):
+                    file.write(section)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def index_post(self, post):
+        """
+        Indexes a post, replacing the postings of its previous version.
+        """
+        self.add_document(post.pk, get_post_word_weights(post))
+
+    def add_document(self, post_id, weights):
+        """
+        Indexes the `{word: weight}` of a post, replacing its previous postings.
+        """
+        with self._lock:
+            self._remove(post_id)
+            self._add(post_id, weights)
+            self._words = None
+
+    def remove_post(self, post_id):
+        with self._lock:
+            self._remove(post_id)
+            self._words = None
+
+    def search(self, search_query):
+        with self._lock:
+            return super().search(search_query)
+
+    def prefix_search(self, search_query):
+        with self._lock:
+            return super().prefix_search(search_query)
+
+    def get_posting(self, word):
+        return self.postings.get(word, {})
+
+    def get_prefix_entries(self, prefix):
+        words = self._get_sorted_words()
+        position = bisect_left(words, prefix)
+        while position < len(words) and words[position].startswith(prefix):
+            yield words[position], self.postings[words[position]]
+            position += 1
+
+    def _add(self, post_id, weights):
+        for word, weight in weights.items():
+            self.postings[word][post_id] = weight
+        self.documents[post_id] = set(weights)
+
+    def _remove(self, post_id):
+        for word in self.documents.pop(post_id, ()):
+            posting = self.postings.get(word)
+            if posting is None:
+                continue
+            posting.pop(post_id, None)
+            if not posting:
+                del self.postings[word]
+
+    def _get_sorted_words(self):
+        if self._words is None:
+            self._words = sorted(self.postings)
+        return self._words
+
+
+class MappedInvertedIndex(BaseInvertedIndex):
+    """
+    A read-only view of an index file written by `InvertedIndex.save`.
+
+    The file is memory-mapped, so it is shared by the processes of a host
+    through the page cache and only the pages holding the looked up words are
+    ever read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self.stat = os.fstat(file.fileno())
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.document_count, self.word_count, blob_size = (
+            HEADER.unpack_from(self._map)
+        )
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a search index file.")
+
+        self._documents_offset = HEADER.size
+        self._table_offset = (
+            self._documents_offset + self.document_count * DOCUMENT.size
+        )
+        self._blob_offset = self._table_offset + self.word_count * WORD.size
+        self._postings_offset = self._blob_offset + blob_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def is_stale(self):
+        """
+        Tells whether the file was replaced since it was mapped.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) != (
+            self.stat.st_ino,
+            self.stat.st_mtime_ns,
+            self.stat.st_size,
+        )
+
+    def documents(self):
+        for (post_id,) in DOCUMENT.iter_unpack(
+            self._map[self._documents_offset : self._table_offset]
+        ):
+            yield post_id
+
+    def has_document(self, post_id):
+        low, high = 0, self.document_count
+        while low < high:
+            middle = (low + high) // 2
+            (document,) = DOCUMENT.unpack_from(
+                self._map, self._documents_offset + middle * DOCUMENT.size
+            )
+            if document < post_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.document_count:
+            return False
+        (document,) = DOCUMENT.unpack_from(
+            self._map, self._documents_offset + low * DOCUMENT.size
+        )
+        return document == post_id
+
+    def get_entry(self, position):
+        word_offset, word_length, first_posting, posting_count = WORD.unpack_from(
+            self._map, self._table_offset + position * WORD.size
+        )
+        start = self._blob_offset + word_offset
+        word = self._map[start : start + word_length].decode()
+        start = self._postings_offset + first_posting * POSTING.size
+        postings = self._map[start : start + posting_count * POSTING.size]
+        return word, dict(POSTING.iter_unpack(postings))
+
+    def get_posting(self, word):
+        position = self._bisect(word)
+        if position < self.word_count:
+            entry_word, posting = self.get_entry(position)
+            if entry_word == word:
+                return posting
+        return {}
+
+    def get_prefix_entries(self, prefix):
+        position = self._bisect(prefix)
+        while position < self.word_count:
+            word, posting = self.get_entry(position)
+            if not word.startswith(prefix):
+                break
+            yield word, posting
+            position += 1
+
+    def _get_word(self, position):
+        word_offset, word_length, _first, _count = WORD.unpack_from(
+            self._map, self._table_offset + position * WORD.size
+        )
+        start = self._blob_offset + word_offset
+        return self._map[start : start + word_length].decode()
+
+    def _bisect(self, word):
+        low, high = 0, self.word_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_word(middle) < word:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+
+def get_delta_log_path(path):
+    return f"{path}.log"
+
+
+class DeltaLog:
+    """
+    The posts saved or deleted since an index file was built, replayed from
+    the log file written by `append`.
+
+    Each line of the log holds the id of a post and its `{word: weight}`, or
+    `null` once the post is deleted, so replaying a line twice is harmless.
+    `refresh` only reads the lines appended since the previous call, and starts
+    over once `truncate` replaced the log.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = InvertedIndex()
+        self.index.is_built = True
+        # Ids of the posts whose version in the index file is outdated.
+        self.changed = set()
+        self._file_id = None
+        self._offset = 0
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def append(path, post_id, weights):
+        """
+        Appends the new `{word: weight}` of a post, `None` when it was deleted.
+
+        Callers serialize appends with the writes of the index file.
+        """
+        line = json.dumps({"id": post_id, "words": weights}, separators=(",", ":"))
+        with open(path, "ab") as file:
+            file.write(f"{line}\n".encode())
+
+    @staticmethod
+    def get_size(path):
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def truncate(path, offset):
+        """
+        Replaces the log with the lines appended after `offset`, once the index
+        file includes every change logged before it.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                if os.path.exists(path):
+                    with open(path, "rb") as log:
+                        log.seek(offset)
+                        file.write(log.read())
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def refresh(self):
+        """
+        Applies the lines appended to the log since the last refresh, returning
+        whether anything changed.
+        """
+        with self.lock:
+            try:
+                file = open(self.path, "rb")
+            except FileNotFoundError:
+                return self._reset(None)
+
+            with file:
+                stat = os.fstat(file.fileno())
+                file_id = (stat.st_dev, stat.st_ino)
+                changed = False
+                if file_id != self._file_id or stat.st_size < self._offset:
+                    changed = self._reset(file_id)
+                if stat.st_size == self._offset:
+                    return changed
+                file.seek(self._offset)
+                data = file.read()
+
+            # A line being appended is read once it is complete.
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                record = json.loads(line)
+                self._apply(record["id"], record["words"])
+            self._offset += end
+            return end > 0 or changed
+
+    def _apply(self, post_id, weights):
+        self.changed.add(post_id)
+        if weights is None:
+            self.index.remove_post(post_id)
+        else:
+            self.index.add_document(post_id, weights)
+
+    def _reset(self, file_id):
+        had_changes = bool(self.changed)
+        self.index = InvertedIndex()
+        self.index.is_built = True
+        self.changed = set()
+        self._file_id = file_id
+        self._offset = 0
+        return had_changes
+
+
+class OverlaidInvertedIndex(BaseInvertedIndex):
+    """
+    A `MappedInvertedIndex` with the posts of a `DeltaLog` replacing their
+    version in the file.
+    """
+
+    def __init__(self, mapped_index, delta_log):
+        self.mapped_index = mapped_index
+        self.delta_log = delta_log
+        with delta_log.lock:
+            removed = sum(
+                1 for post_id in delta_log.changed if mapped_index.has_document(post_id)
+            )
+            self.document_count = (
+                mapped_index.document_count - removed + delta_log.index.document_count
+            )
+
+    def search(self, search_query):
+        with self.delta_log.lock:
+            return super().search(search_query)
+
+    def prefix_search(self, search_query):
+        with self.delta_log.lock:
+            return super().prefix_search(search_query)
+
+    def get_posting(self, word):
+        posting = self.mapped_index.get_posting(word)
+        changed = self.delta_log.changed
+        if not changed:
+            return posting
+        posting = {
+            post_id: weight
+            for post_id, weight in posting.items()
+            if post_id not in changed
+        }
+        posting.update(self.delta_log.index.get_posting(word))
+        return posting
+
+    def get_prefix_entries(self, prefix):
+        changed = self.delta_log.changed
+        if not changed:
+            yield from self.mapped_index.get_prefix_entries(prefix)
+            return
+
+        entries = {}
+        for word, posting in self.mapped_index.get_prefix_entries(prefix):
+            entries[word] = {
+                post_id: weight
+                for post_id, weight in posting.items()
+                if post_id not in changed
+            }
+        for word, posting in self.delta_log.index.get_prefix_entries(prefix):
+            entries.setdefault(word, {}).update(posting)
+        for word in sorted(entries):
+            if entries[word]:
+                yield word, entries[word]
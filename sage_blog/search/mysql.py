@@ -0,0 +1,154 @@
+"""
+MySQL and MariaDB FULLTEXT search schema helpers.
+
+Every configured language gets a FULLTEXT index over its translated `title`,
+`summary` and `description` columns, so the search queryset methods can use
+`MATCH ... AGAINST` instead of `LIKE '%q%'` scans over the descriptions.
+`full_text_search` queries the index in natural language mode, while
+`trigram_similarity_search` uses boolean mode with prefix terms to approximate
+fuzzy matching. These helpers are meant to be called from migrations and are
+no-ops on other database engines.
+
+The indexes follow the languages resolved at migration time; run the
+`rebuild_search_vectors` management command after changing `LANGUAGES`. Set
+`SAGE_BLOG_MYSQL_FULL_TEXT_SEARCH` to `False` to keep the `LIKE` based search.
+"""
+
+import re
+
+from django.conf import settings
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.lookups import GreaterThan
+from modeltranslation.utils import build_localized_fieldname
+
+from sage_blog.search.postgres import SEARCHABLE_FIELDS, get_search_languages
+
+FULL_TEXT_INDEX_SUFFIX = "_fulltext"
+
+
+def is_mysql(schema_editor):
+    # Django reports MariaDB connections with the `mysql` vendor too.
+    return schema_editor.connection.vendor == "mysql"
+
+
+def is_full_text_search_enabled():
+    return getattr(settings, "SAGE_BLOG_MYSQL_FULL_TEXT_SEARCH", True)
+
+
+def get_full_text_columns(language):
+    return [
+        build_localized_fieldname(field_name, language)
+        for field_name, _weight in SEARCHABLE_FIELDS
+    ]
+
+
+def get_full_text_index_name(language):
+    return f"sage_post_{language.replace('-', '_')}{FULL_TEXT_INDEX_SUFFIX}"
+
+
+def get_prefix_query(search_query):
+    """
+    Builds a boolean mode query matching any word of the input as a prefix.
+
+    Only word characters are kept, so boolean operators typed by users cannot
+    produce syntax errors. Returns an empty string when the input holds no
+    words.
+    """
+    words = re.findall(r"\w+", search_query)
+    return " ".join(f"{word}*" for word in words)
+
+
+class MatchAgainst(Func):
+    """
+    `MATCH (columns) AGAINST (query)` relevance of a row, higher is better.
+
+    The columns must be exactly those of a FULLTEXT index, which is why they
+    are given as field names of the translated columns of one language.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, *columns, search_query, boolean=False, **extra):
+        self.boolean = boolean
+        super().__init__(
+            *(F(column) for column in columns), Value(search_query), **extra
+        )
+
+    def as_sql(self, compiler, connection, **extra_context):
+        *columns, search_query = self.source_expressions
+        columns_sql = []
+        params = []
+        for column in columns:
+            column_sql, column_params = compiler.compile(column)
+            columns_sql.append(column_sql)
+            params.extend(column_params)
+        query_sql, query_params = compiler.compile(search_query)
+        params.extend(query_params)
+        mode = "IN BOOLEAN MODE" if self.boolean else "IN NATURAL LANGUAGE MODE"
+        sql = f"MATCH ({', '.join(columns_sql)}) AGAINST ({query_sql} {mode})"
+        return sql, tuple(params)
+
+
+def get_match_condition(language, search_query, boolean=False):
+    """
+    Returns a filter condition matching rows with a positive relevance.
+
+    MySQL can serve `MATCH (...) AGAINST (...) > 0` from the FULLTEXT index,
+    while Django would compare a bare boolean expression to `TRUE`.
+    """
+    relevance = MatchAgainst(
+        *get_full_text_columns(language), search_query=search_query, boolean=boolean
+    )
+    return GreaterThan(relevance, 0)
+
+
+def create_full_text_indexes(apps, schema_editor):
+    """
+    Creates a FULLTEXT index over the searchable columns of every language.
+
+    django-modeltranslation rewrites lookups to the column of the active
+    language, and `MATCH` needs an index over exactly the columns it lists, so
+    each language has its own index. Indexes of languages that are no longer
+    configured are dropped.
+    """
+    if not is_mysql(schema_editor):
+        return
+
+    languages = get_search_languages()
+    wanted = {get_full_text_index_name(language) for language in languages}
+    existing = get_existing_index_names(schema_editor)
+
+    for name in existing - wanted:
+        schema_editor.execute(f"DROP INDEX {name} ON sage_post;")
+
+    for language in languages:
+        name = get_full_text_index_name(language)
+        if name in existing:
+            continue
+        columns = ", ".join(get_full_text_columns(language))
+        schema_editor.execute(f"CREATE FULLTEXT INDEX {name} ON sage_post ({columns});")
+
+
+def drop_full_text_indexes(apps, schema_editor):
+    """
+    Removes the FULLTEXT indexes created by `create_full_text_indexes`.
+    """
+    if not is_mysql(schema_editor):
+        return
+
+    for name in get_existing_index_names(schema_editor):
+        schema_editor.execute(f"DROP INDEX {name} ON sage_post;")
+
+
+def get_existing_index_names(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'sage_post' "
+            "AND index_type = 'FULLTEXT'"
+        )
+        return {
+            name
+            for (name,) in cursor.fetchall()
+            if name.endswith(FULL_TEXT_INDEX_SUFFIX)
+        }
@@ -0,0 +1,342 @@
+"""
+PostgreSQL full-text search schema helpers.
+
+The stored `sage_post.search_vector` column is maintained by a trigger, so rows
+written through `save()`, `bulk_create()`, `bulk_update()`, `QuerySet.update()` or
+raw SQL are all indexed the same way. These helpers are meant to be called from
+migrations and are no-ops on other database engines.
+
+Trigram search matches the translated `title` and `summary` columns and a
+plain-text `search_excerpt` of the description with the `%` and `<%` operators,
+all served by `gin_trgm_ops` indexes.
+
+Migrations freeze their own copy of the SQL and leave out what depends on
+settings, such as the localized search trigger. The helpers below install the
+triggers and indexes of the current settings; run the `rebuild_search_vectors`
+management command after changing `LANGUAGES`,
+`MODELTRANSLATION_DEFAULT_LANGUAGE`, `SAGE_BLOG_SEARCH_CONFIGS` or
+`SAGE_BLOG_LOCALIZED_SEARCH`.
+"""
+
+from django.conf import settings
+from modeltranslation import settings as mt_settings
+from modeltranslation.utils import build_localized_fieldname
+
+SEARCH_VECTOR_FUNCTION = "sage_post_search_vector_update"
+SEARCH_VECTOR_TRIGGER = "sage_post_search_vector_trigger"
+SEARCH_VECTOR_INDEX = "sage_post_search_vector_gin"
+
+LOCALIZED_SEARCH_VECTOR_FUNCTION = "sage_post_localized_search_vector_update"
+LOCALIZED_SEARCH_VECTOR_TRIGGER = "sage_post_localized_search_vector_trigger"
+LOCALIZED_SEARCH_VECTOR_INDEX = "sage_post_localized_search_vector_gin"
+
+SEARCHABLE_FIELDS = (("title", "A"), ("summary", "B"), ("description", "C"))
+
+# Translated columns matched with trigram operators, see `create_trigram_indexes`.
+TRIGRAM_FIELDS = ("title", "summary")
+TRIGRAM_INDEX_SUFFIX = "_trgm"
+SEARCH_EXCERPT_LENGTH = 500
+
+# Text search configurations shipped with every supported PostgreSQL release.
+# Languages without a dedicated configuration (e.g. Persian) use `simple`.
+SEARCH_CONFIGS = {
+    "ar": "arabic",
+    "da": "danish",
+    "de": "german",
+    "en": "english",
+    "es": "spanish",
+    "fi": "finnish",
+    "fr": "french",
+    "ga": "irish",
+    "hu": "hungarian",
+    "id": "indonesian",
+    "it": "italian",
+    "lt": "lithuanian",
+    "nb": "norwegian",
+    "ne": "nepali",
+    "nl": "dutch",
+    "nn": "norwegian",
+    "pt": "portuguese",
+    "ro": "romanian",
+    "ru": "russian",
+    "sv": "swedish",
+    "ta": "tamil",
+    "tr": "turkish",
+}
+DEFAULT_SEARCH_CONFIG = "simple"
+
+# Touching an indexed column fires the triggers for rows that predate them.
+BACKFILL_SEARCH_VECTOR = "UPDATE sage_post SET title = title;"
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == "postgresql"
+
+
+def is_localized_search_enabled():
+    return getattr(settings, "SAGE_BLOG_LOCALIZED_SEARCH", False)
+
+
+def get_search_languages():
+    return list(mt_settings.AVAILABLE_LANGUAGES)
+
+
+def get_search_config(language):
+    """
+    Returns the text search configuration used for a language code.
+
+    `SAGE_BLOG_SEARCH_CONFIGS` overrides the built-in mapping. Regional codes
+    such as `pt-br` fall back to their base language.
+    """
+    configs = {**SEARCH_CONFIGS, **getattr(settings, "SAGE_BLOG_SEARCH_CONFIGS", {})}
+    for code in (language, language.split("-")[0]):
+        if code in configs:
+            return configs[code]
+    return DEFAULT_SEARCH_CONFIG
+
+
+def get_searchable_columns(field_name, language=None):
+    """
+    Returns the columns holding the value of a translated field in a language.
+
+    django-modeltranslation writes queryset updates to the localized column
+    (e.g. `title_en`) and leaves the original column untouched, so documents
+    prefer the localized column and fall back to the original one.
+    """
+    language = language or mt_settings.DEFAULT_LANGUAGE
+    return build_localized_fieldname(field_name, language), field_name
+
+
+def get_column_sql(field_name, language=None):
+    localized, original = get_searchable_columns(field_name, language)
+    return f"coalesce(nullif(NEW.{localized}, ''), NEW.{original}, '')"
+
+
+def get_plain_text_sql(document):
+    return f"regexp_replace({document}, '<[^>]*>', ' ', 'g')"
+
+
+def get_excerpt_sql():
+    plain_text = get_plain_text_sql(get_column_sql("description"))
+    collapsed = f"btrim(regexp_replace({plain_text}, '\\s+', ' ', 'g'))"
+    return f"left({collapsed}, {SEARCH_EXCERPT_LENGTH})"
+
+
+def get_document_sql(language=None, config=None):
+    documents = []
+    for field_name, weight in SEARCHABLE_FIELDS:
+        document = get_column_sql(field_name, language)
+        if field_name == "description":
+            document = get_plain_text_sql(document)
+        if config:
+            document = f"'{config}'::regconfig, {document}"
+        documents.append(f"setweight(to_tsvector({document}), '{weight}')")
+    return "\n        || ".join(documents)
+
+
+def get_trigger_columns(languages):
+    columns = dict.fromkeys(
+        column
+        for language in languages
+        for field_name, _weight in SEARCHABLE_FIELDS
+        for column in get_searchable_columns(field_name, language)
+    )
+    return ", ".join(columns)
+
+
+def get_search_vector_function_sql():
+    return f"""
+CREATE OR REPLACE FUNCTION {SEARCH_VECTOR_FUNCTION}() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        {get_document_sql()};
+    NEW.search_excerpt := {get_excerpt_sql()};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def get_search_vector_trigger_sql():
+    return f"""
+CREATE TRIGGER {SEARCH_VECTOR_TRIGGER}
+BEFORE INSERT OR UPDATE OF {get_trigger_columns([None])} ON sage_post
+FOR EACH ROW EXECUTE FUNCTION {SEARCH_VECTOR_FUNCTION}();
+"""
+
+
+def get_localized_search_vector_function_sql():
+    rows = ",\n    ".join(
+        f"(NEW.id, '{language}',\n        "
+        f"{get_document_sql(language, get_search_config(language))})"
+        for language in get_search_languages()
+    )
+    return f"""
+CREATE OR REPLACE FUNCTION {LOCALIZED_SEARCH_VECTOR_FUNCTION}() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO sage_post_search_vector (post_id, language, vector) VALUES
+    {rows}
+    ON CONFLICT (post_id, language) DO UPDATE SET vector = EXCLUDED.vector;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def get_localized_search_vector_trigger_sql():
+    columns = get_trigger_columns(get_search_languages())
+    return f"""
+CREATE TRIGGER {LOCALIZED_SEARCH_VECTOR_TRIGGER}
+AFTER INSERT OR UPDATE OF {columns} ON sage_post
+FOR EACH ROW EXECUTE FUNCTION {LOCALIZED_SEARCH_VECTOR_FUNCTION}();
+"""
+
+
+def create_search_vector(apps, schema_editor):
+    """
+    Installs the trigger and GIN index backing `Post.search_vector` and
+    `Post.search_excerpt`.
+    """
+    if not is_postgresql(schema_editor):
+        return
+
+    schema_editor.execute(get_search_vector_function_sql())
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {SEARCH_VECTOR_TRIGGER} ON sage_post;"
+    )
+    schema_editor.execute(get_search_vector_trigger_sql())
+    schema_editor.execute(BACKFILL_SEARCH_VECTOR)
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_VECTOR_INDEX} "
+        "ON sage_post USING gin (search_vector);"
+    )
+
+
+def drop_search_vector(apps, schema_editor):
+    """
+    Removes the trigger, function and GIN index backing `Post.search_vector`.
+    """
+    if not is_postgresql(schema_editor):
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_VECTOR_INDEX};")
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {SEARCH_VECTOR_TRIGGER} ON sage_post;"
+    )
+    schema_editor.execute(f"DROP FUNCTION IF EXISTS {SEARCH_VECTOR_FUNCTION}();")
+
+
+def create_localized_search_vectors(apps, schema_editor):
+    """
+    Installs the trigger filling `PostSearchVector` rows and their GIN index.
+
+    The trigger is only installed while `SAGE_BLOG_LOCALIZED_SEARCH` is enabled,
+    as it writes one document per configured language on every post write.
+    """
+    if not is_postgresql(schema_editor):
+        return
+
+    drop_localized_search_vectors(apps, schema_editor)
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {LOCALIZED_SEARCH_VECTOR_INDEX} "
+        "ON sage_post_search_vector USING gin (vector);"
+    )
+    if not is_localized_search_enabled():
+        schema_editor.execute("DELETE FROM sage_post_search_vector;")
+        return
+
+    schema_editor.execute(get_localized_search_vector_function_sql())
+    schema_editor.execute(get_localized_search_vector_trigger_sql())
+    schema_editor.execute(BACKFILL_SEARCH_VECTOR)
+
+
+def drop_localized_search_vectors(apps, schema_editor):
+    """
+    Removes the trigger and function filling `PostSearchVector` rows.
+    """
+    if not is_postgresql(schema_editor):
+        return
+
+    schema_editor.execute(
+        f"DROP TRIGGER IF EXISTS {LOCALIZED_SEARCH_VECTOR_TRIGGER} ON sage_post;"
+    )
+    schema_editor.execute(
+        f"DROP FUNCTION IF EXISTS {LOCALIZED_SEARCH_VECTOR_FUNCTION}();"
+    )
+
+
+def get_trigram_columns():
+    columns = dict.fromkeys(
+        column
+        for language in get_search_languages()
+        for field_name in TRIGRAM_FIELDS
+        for column in get_searchable_columns(field_name, language)
+    )
+    return [*columns, "search_excerpt"]
+
+
+def get_trigram_index_name(column):
+    return f"sage_post_{column}{TRIGRAM_INDEX_SUFFIX}"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Creates `gin_trgm_ops` indexes for the columns matched by trigram search.
+
+    django-modeltranslation rewrites lookups on `title` and `summary` to the
+    column of the active language, so every configured language gets its own
+    index. They are partial indexes over non-null values: the trigram operators
+    are strict, which lets PostgreSQL use them while untranslated languages
+    cost next to nothing.
+    """
+    if not is_postgresql(schema_editor):
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    columns = get_trigram_columns()
+    wanted = {get_trigram_index_name(column) for column in columns}
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'sage_post'")
+        existing = {name for (name,) in cursor.fetchall()}
+
+    for name in existing - wanted:
+        if name.endswith(TRIGRAM_INDEX_SUFFIX):
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+    for column in columns:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {get_trigram_index_name(column)} "
+            f"ON sage_post USING gin ({column} gin_trgm_ops) "
+            f"WHERE {column} IS NOT NULL;"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """
+    Removes the `gin_trgm_ops` indexes created by `create_trigram_indexes`.
+    """
+    if not is_postgresql(schema_editor):
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'sage_post'")
+        existing = [name for (name,) in cursor.fetchall()]
+
+    for name in existing:
+        if name.endswith(TRIGRAM_INDEX_SUFFIX):
+            schema_editor.execute(f"DROP INDEX IF EXISTS {name};")
+
+
+def get_trigram_thresholds():
+    """
+    Returns the configured `pg_trgm` thresholds, leaving unset ones out.
+    """
+    thresholds = {
+        "pg_trgm.similarity_threshold": getattr(
+            settings, "SAGE_BLOG_TRIGRAM_SIMILARITY_THRESHOLD", None
+        ),
+        "pg_trgm.word_similarity_threshold": getattr(
+            settings, "SAGE_BLOG_TRIGRAM_WORD_SIMILARITY_THRESHOLD", None
+        ),
+    }
+    return {name: value for name, value in thresholds.items() if value is not None}
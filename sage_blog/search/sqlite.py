@@ -0,0 +1,309 @@
+"""
+SQLite FTS5 full-text search schema helpers.
+
+Posts are mirrored into the `sage_post_fts` virtual table, keyed by the post id
+as `rowid` and maintained by triggers, so `full_text_search` and `heavy_search`
+can match words through the FTS5 index and rank hits with `bm25()` instead of
+scanning every description with `LIKE`. These helpers are meant to be called
+from migrations and are no-ops on other database engines.
+
+FTS5 search is opt-in with `SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH`, as it matches
+whole words where the default search matches substrings with `LIKE`. The index
+is created by the migrations when the setting is enabled, or later by the
+`rebuild_search_vectors` management command.
+
+SQLite recreates a table for most `ALTER TABLE` operations, which drops its
+triggers. `restore_full_text_triggers` reinstalls them and reindexes every post
+once migrations have run.
+"""
+
+import re
+import sqlite3
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Expression, FloatField
+from django.db.models.sql.constants import INNER, LOUTER
+
+from sage_blog.search.postgres import SEARCHABLE_FIELDS, get_searchable_columns
+
+FULL_TEXT_TABLE = "sage_post_fts"
+FULL_TEXT_INSERT_TRIGGER = "sage_post_fts_insert"
+FULL_TEXT_UPDATE_TRIGGER = "sage_post_fts_update"
+FULL_TEXT_DELETE_TRIGGER = "sage_post_fts_delete"
+FULL_TEXT_TRIGGERS = (
+    FULL_TEXT_INSERT_TRIGGER,
+    FULL_TEXT_UPDATE_TRIGGER,
+    FULL_TEXT_DELETE_TRIGGER,
+)
+
+# `bm25()` column weights, in the order of `SEARCHABLE_FIELDS`.
+FULL_TEXT_WEIGHTS = {"A": 10.0, "B": 5.0, "C": 1.0}
+
+
+def is_sqlite(schema_editor):
+    return schema_editor.connection.vendor == "sqlite"
+
+
+@lru_cache(maxsize=None)
+def is_fts5_available():
+    """
+    Tells whether the SQLite library Python links against was built with FTS5.
+    """
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+    return True
+
+
+def is_full_text_search_enabled():
+    return (
+        getattr(settings, "SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH", False)
+        and is_fts5_available()
+    )
+
+
+def get_match_expression(search_query):
+    """
+    Turns user input into an FTS5 query matching posts containing every word.
+
+    Words are quoted so FTS5 operators and punctuation in the input are matched
+    literally instead of raising syntax errors. Returns an empty string when the
+    input holds no words.
+    """
+    words = re.findall(r"\w+", search_query)
+    return " ".join(f'"{word}"' for word in words)
+
+
+def get_match_sql():
+    return f"SELECT rowid FROM {FULL_TEXT_TABLE} WHERE {FULL_TEXT_TABLE} MATCH %s"
+
+
+def get_rank_sql():
+    weights = ", ".join(
+        str(FULL_TEXT_WEIGHTS[weight]) for _field_name, weight in SEARCHABLE_FIELDS
+    )
+    return (
+        f"SELECT rowid AS post_id, -bm25({FULL_TEXT_TABLE}, {weights}) AS score "
+        f"FROM {FULL_TEXT_TABLE} WHERE {FULL_TEXT_TABLE} MATCH %s"
+    )
+
+
+class FullTextRankJoin:
+    """
+    Joins the `bm25()` relevance of the posts matching an FTS5 query.
+
+    The full-text query runs once in a derived table, which SQLite materializes
+    and searches by post id, instead of once per post. Implements the interface
+    `Query.alias_map` expects of `django.db.models.sql.datastructures.Join`.
+    """
+
+    table_name = f"{FULL_TEXT_TABLE}_rank"
+    join_field = None
+    filtered_relation = None
+    nullable = True
+
+    def __init__(
+        self,
+        parent_alias,
+        pk_column,
+        match_expression,
+        table_alias=None,
+        join_type=LOUTER,
+    ):
+        self.parent_alias = parent_alias
+        self.pk_column = pk_column
+        self.match_expression = match_expression
+        self.table_alias = table_alias
+        self.join_type = join_type
+
+    def as_sql(self, compiler, connection):
+        qn = compiler.quote_name_unless_alias
+        alias = qn(self.table_alias)
+        pk = f"{qn(self.parent_alias)}.{connection.ops.quote_name(self.pk_column)}"
+        sql = (
+            f"{self.join_type} ({get_rank_sql()}) {alias} "
+            f"ON ({alias}.post_id = {pk})"
+        )
+        return sql, (self.match_expression,)
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            change_map.get(self.parent_alias, self.parent_alias),
+            self.pk_column,
+            self.match_expression,
+            change_map.get(self.table_alias, self.table_alias),
+            self.join_type,
+        )
+
+    @property
+    def identity(self):
+        return (
+            self.__class__,
+            self.parent_alias,
+            self.pk_column,
+            self.match_expression,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, FullTextRankJoin):
+            return NotImplemented
+        return self.identity == other.identity
+
+    def __hash__(self):
+        return hash(self.identity)
+
+    def demote(self):
+        new = self.relabeled_clone({})
+        new.join_type = INNER
+        return new
+
+    def promote(self):
+        new = self.relabeled_clone({})
+        new.join_type = LOUTER
+        return new
+
+
+class FullTextRank(Expression):
+    """
+    The `bm25()` relevance of a post for an FTS5 query, higher is better.
+
+    `bm25()` is only available within a full-text query, so the relevance is
+    read from a `FullTextRankJoin` added to the query. It is `NULL` for posts
+    not matching the query.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, match_expression, alias=None):
+        super().__init__()
+        self.match_expression = match_expression
+        self.alias = alias
+
+    def resolve_expression(
+        self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False
+    ):
+        clone = self.copy()
+        join = FullTextRankJoin(
+            query.get_initial_alias(),
+            query.get_meta().pk.column,
+            self.match_expression,
+        )
+        clone.alias = query.join(join, reuse=reuse)
+        return clone
+
+    def relabeled_clone(self, change_map):
+        clone = self.copy()
+        clone.alias = change_map.get(self.alias, self.alias)
+        return clone
+
+    def as_sql(self, compiler, connection):
+        return f"{compiler.quote_name_unless_alias(self.alias)}.score", []
+
+
+def get_column_sql(field_name, row="NEW"):
+    localized, original = get_searchable_columns(field_name)
+    return f"coalesce(nullif({row}.{localized}, ''), {row}.{original}, '')"
+
+
+def get_full_text_columns():
+    return ", ".join(field_name for field_name, _weight in SEARCHABLE_FIELDS)
+
+
+def get_insert_sql(row="NEW"):
+    values = ", ".join(
+        get_column_sql(field_name, row) for field_name, _weight in SEARCHABLE_FIELDS
+    )
+    return (
+        f"INSERT INTO {FULL_TEXT_TABLE} (rowid, {get_full_text_columns()}) "
+        f"VALUES ({row}.id, {values});"
+    )
+
+
+def get_backfill_sql():
+    values = ", ".join(
+        get_column_sql(field_name, "sage_post")
+        for field_name, _weight in SEARCHABLE_FIELDS
+    )
+    return (
+        f"INSERT INTO {FULL_TEXT_TABLE} (rowid, {get_full_text_columns()}) "
+        f"SELECT sage_post.id, {values} FROM sage_post;"
+    )
+
+
+def get_trigger_columns():
+    columns = dict.fromkeys(
+        column
+        for field_name, _weight in SEARCHABLE_FIELDS
+        for column in get_searchable_columns(field_name)
+    )
+    return ", ".join(columns)
+
+
+def get_trigger_sql():
+    delete = f"DELETE FROM {FULL_TEXT_TABLE} WHERE rowid = OLD.id;"
+    return [
+        f"CREATE TRIGGER {FULL_TEXT_INSERT_TRIGGER} AFTER INSERT ON sage_post "
+        f"BEGIN {get_insert_sql()} END;",
+        f"CREATE TRIGGER {FULL_TEXT_UPDATE_TRIGGER} "
+        f"AFTER UPDATE OF id, {get_trigger_columns()} ON sage_post "
+        f"BEGIN {delete} {get_insert_sql()} END;",
+        f"CREATE TRIGGER {FULL_TEXT_DELETE_TRIGGER} AFTER DELETE ON sage_post "
+        f"BEGIN {delete} END;",
+    ]
+
+
+def has_lost_triggers(connection):
+    """
+    Tells whether the `sage_post_fts` table exists without all of its triggers,
+    as left by migrations rebuilding `sage_post`.
+    """
+    names = (FULL_TEXT_TABLE, *FULL_TEXT_TRIGGERS)
+    placeholders = ", ".join(["%s"] * len(names))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({placeholders})", names
+        )
+        installed = {name for (name,) in cursor.fetchall()}
+    return FULL_TEXT_TABLE in installed and installed != set(names)
+
+
+def create_full_text_index(apps, schema_editor):
+    """
+    Creates the `sage_post_fts` table, installs its triggers and indexes every
+    post.
+
+    HTML tags of the description are indexed as words, SQLite has no regular
+    expression replacement to strip them; `bm25()` weights the description
+    lowest so they hardly affect ranking.
+    """
+    if not is_sqlite(schema_editor):
+        return
+
+    drop_full_text_index(apps, schema_editor)
+    if not is_full_text_search_enabled():
+        return
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FULL_TEXT_TABLE} USING fts5("
+        f"{get_full_text_columns()}, tokenize = 'unicode61 remove_diacritics 2');"
+    )
+    for sql in get_trigger_sql():
+        schema_editor.execute(sql)
+    schema_editor.execute(get_backfill_sql())
+
+
+def drop_full_text_index(apps, schema_editor):
+    """
+    Removes the triggers and the `sage_post_fts` table.
+    """
+    if not is_sqlite(schema_editor):
+        return
+
+    for trigger in FULL_TEXT_TRIGGERS:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FULL_TEXT_TABLE};")
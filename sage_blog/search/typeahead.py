@@ -0,0 +1,194 @@
+"""
+Typeahead suggestions over the titles of published posts and tags.
+
+Keystrokes are answered from a `PrefixIndex`, a sorted list of the words of
+every title held in the memory of each process, instead of running a search
+query. The index of each language is built on first use and rebuilt once the
+`TYPEAHEAD_CACHE_NAMESPACE` generation is bumped, i.e. after a post or a tag
+changes. A rebuild only locks its own language and other threads keep being
+answered from the stale index meanwhile. Suggestions of hot prefixes are
+also kept in the cache configured by `SAGE_BLOG_CACHE_ALIAS`, so most
+keystrokes never reach the index at all.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.utils.html import strip_tags
+from modeltranslation.utils import get_language
+
+from sage_blog.models import Post, PostTag
+from sage_blog.search.inverted_index import WORD_PATTERN
+from sage_blog.search.postgres import get_searchable_columns
+from sage_blog.utils.cache import get_cache, get_generation, make_cache_key
+
+TYPEAHEAD_CACHE_NAMESPACE = "typeahead"
+
+# Suggestions whose title starts with the prefix come before the ones where a
+# later word does, then tags before posts.
+TITLE_MATCH = 0
+WORD_MATCH = 1
+
+TAG_SUGGESTION = "tag"
+POST_SUGGESTION = "post"
+KIND_ORDER = {TAG_SUGGESTION: 0, POST_SUGGESTION: 1}
+
+_indexes = {}
+_locks = {}
+_lock = threading.Lock()
+
+
+def normalize(text):
+    return " ".join(strip_tags(text or "").lower().split())
+
+
+class PrefixIndex:
+    """
+    Sorted `(key, suggestion id, match)` entries where the keys are the suffixes
+    of a title starting at each word, so `"dive"` finds "Night dives in Bali".
+
+    A prefix is located by binary search and only the matching range is read.
+    """
+
+    def __init__(self, generation=None):
+        self.generation = generation
+        self.keys = []
+        self.entries = []
+        self.suggestions = []
+
+    @classmethod
+    def build(cls, items, generation=None):
+        """
+        Builds an index from `(kind, slug, title)` triples.
+        """
+        index = cls(generation)
+        entries = []
+        for kind, slug, title in items:
+            title = " ".join((title or "").split())
+            normalized = normalize(title)
+            if not normalized:
+                continue
+            suggestion_id = len(index.suggestions)
+            index.suggestions.append({"kind": kind, "slug": slug, "title": title})
+            for word in WORD_PATTERN.finditer(normalized):
+                start = word.start()
+                match = TITLE_MATCH if start == 0 else WORD_MATCH
+                entries.append((normalized[start:], suggestion_id, match))
+        entries.sort()
+        index.keys = [key for key, _suggestion_id, _match in entries]
+        index.entries = entries
+        return index
+
+    def suggest(self, prefix, limit=10):
+        """
+        Returns at most `limit` suggestions whose title has a word starting with
+        `prefix`, best matches first.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        candidates = {}
+        position = bisect_left(self.keys, prefix)
+        while position < len(self.keys) and self.keys[position].startswith(prefix):
+            _key, suggestion_id, match = self.entries[position]
+            candidates[suggestion_id] = min(
+                candidates.get(suggestion_id, WORD_MATCH), match
+            )
+            position += 1
+
+        best = heapq.nsmallest(
+            limit,
+            candidates.items(),
+            key=lambda item: (
+                item[1],
+                KIND_ORDER[self.suggestions[item[0]]["kind"]],
+                len(self.suggestions[item[0]]["title"]),
+                self.suggestions[item[0]]["title"],
+            ),
+        )
+        return [self.suggestions[suggestion_id] for suggestion_id, _match in best]
+
+
+def get_typeahead_items(language):
+    """
+    Yields the `(kind, slug, title)` triples of the published tags and posts.
+    """
+    localized, original = get_searchable_columns("title", language)
+    for kind, queryset in (
+        (TAG_SUGGESTION, PostTag.objects.filter(is_published=True)),
+        (POST_SUGGESTION, Post.objects.filter(is_published=True)),
+    ):
+        rows = queryset.values_list("slug", localized, original).iterator()
+        for slug, localized_title, title in rows:
+            yield kind, slug, localized_title or title
+
+
+def is_fresh(index, generation):
+    return index is not None and index.generation >= generation
+
+
+def get_language_lock(language):
+    with _lock:
+        return _locks.setdefault(language, threading.Lock())
+
+
+def get_prefix_index(language=None):
+    """
+    Returns the prefix index of a language, rebuilding it when stale.
+
+    A fresh index is returned without locking. A stale one is rebuilt under the
+    lock of its language only, and threads finding that lock taken get the
+    stale index back rather than waiting for the rebuild.
+    """
+    language = language or get_language()
+    generation = get_generation(TYPEAHEAD_CACHE_NAMESPACE)
+    index = _indexes.get(language)
+    if is_fresh(index, generation):
+        return index
+
+    lock = get_language_lock(language)
+    if not lock.acquire(blocking=index is None):
+        return index
+    try:
+        index = _indexes.get(language)
+        if not is_fresh(index, generation):
+            index = PrefixIndex.build(get_typeahead_items(language), generation)
+            _indexes[language] = index
+        return index
+    finally:
+        lock.release()
+
+
+def get_suggestions(prefix, limit=None, language=None):
+    """
+    Returns the typeahead suggestions of a prefix as a list of dictionaries with
+    the `kind` (`"tag"` or `"post"`), `slug` and `title` of each match.
+
+    Prefixes shorter than `SAGE_BLOG_TYPEAHEAD_MIN_LENGTH` characters (2 by
+    default) match nothing. Suggestions are cached for
+    `SAGE_BLOG_TYPEAHEAD_CACHE_TIMEOUT` seconds (300 by default).
+    """
+    prefix = normalize(prefix)
+    if len(prefix) < getattr(settings, "SAGE_BLOG_TYPEAHEAD_MIN_LENGTH", 2):
+        return []
+
+    language = language or get_language()
+    limit = limit or getattr(settings, "SAGE_BLOG_TYPEAHEAD_LIMIT", 10)
+    cache = get_cache()
+    key = make_cache_key(TYPEAHEAD_CACHE_NAMESPACE, language, limit, prefix)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        index = get_prefix_index(language)
+        suggestions = index.suggest(prefix, limit)
+        # Suggestions of a stale index served during a rebuild are not cached
+        # under the current generation.
+        if is_fresh(index, get_generation(TYPEAHEAD_CACHE_NAMESPACE)):
+            cache.set(
+                key,
+                suggestions,
+                getattr(settings, "SAGE_BLOG_TYPEAHEAD_CACHE_TIMEOUT", 300),
+            )
+    return suggestions
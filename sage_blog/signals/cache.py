@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from sage_blog.models import Post, PostCategory, PostTag
+from sage_blog.utils.cache import SIDEBAR_CACHE_NAMESPACE, bump_generation
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=PostCategory)
+@receiver(post_delete, sender=PostCategory)
+@receiver(post_save, sender=PostTag)
+@receiver(post_delete, sender=PostTag)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_sidebar(sender, **kwargs):
+    """
+    Marks the sidebar entries of `SageBlogContextMixin` stale once a content
+    change is committed; they are recomputed by the next page render.
+    """
+    if kwargs.get("action", "post_").startswith("post_"):
+        transaction.on_commit(partial(bump_generation, SIDEBAR_CACHE_NAMESPACE))
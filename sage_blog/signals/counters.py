@@ -0,0 +1,110 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from sage_blog.models import Post, PostCategory, PostTag, PostTagUsage
+from sage_blog.repository.counters import get_usage_day
+
+# Attributes remembering what a post counted for when it was loaded or saved.
+COUNTED_STATE = "_post_counts_state"
+COUNTED_TAGS = "_post_counts_tag_ids"
+
+
+def refresh_categories(*category_ids):
+    category_ids = {pk for pk in category_ids if pk is not None}
+    if category_ids:
+        PostCategory.objects.filter(pk__in=category_ids).refresh_post_counts()
+
+
+def refresh_tags(tag_ids, *created_ats):
+    """
+    Refreshes the counters and trend scores of tags and their usage buckets of
+    the days of the given creation times, or of every day when none is given.
+    """
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return
+    tags = PostTag.objects.filter(pk__in=tag_ids)
+    tags.refresh_post_counts()
+    days = {get_usage_day(created_at) for created_at in created_ats if created_at}
+    PostTagUsage.objects.refresh(tag_ids, days if created_ats else None)
+    tags.refresh_trend_scores()
+
+
+@receiver(post_init, sender=Post)
+def remember_counted_state(sender, instance, **kwargs):
+    # Read the instance dictionary so deferred fields are not fetched.
+    setattr(
+        instance,
+        COUNTED_STATE,
+        (
+            instance.__dict__.get("category_id"),
+            instance.__dict__.get("is_published"),
+            instance.__dict__.get("created_at"),
+        ),
+    )
+
+
+@receiver(post_save, sender=Post)
+def refresh_counts_on_save(sender, instance, created, **kwargs):
+    """
+    Refreshes the counters of the categories a post left or joined and, when
+    its published status or creation time changed, of its tags.
+    """
+    category_id, is_published, created_at = getattr(
+        instance, COUNTED_STATE, (None, None, None)
+    )
+    state = (instance.category_id, instance.is_published, instance.created_at)
+    setattr(instance, COUNTED_STATE, state)
+    if not created and (category_id, is_published, created_at) == state:
+        return
+
+    refresh_categories(category_id, instance.category_id)
+    if not created and (is_published, created_at) != state[1:]:
+        refresh_tags(
+            instance.tags.values_list("pk", flat=True),
+            created_at,
+            instance.created_at,
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def remember_counted_tags(sender, instance, **kwargs):
+    setattr(instance, COUNTED_TAGS, list(instance.tags.values_list("pk", flat=True)))
+
+
+@receiver(post_delete, sender=Post)
+def refresh_counts_on_delete(sender, instance, **kwargs):
+    refresh_categories(instance.category_id)
+    refresh_tags(getattr(instance, COUNTED_TAGS, ()), instance.created_at)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def refresh_counts_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refreshes the counters of the tags added to or removed from posts.
+    """
+    if reverse:
+        # `instance` is a tag whose posts changed.
+        if action in ("post_add", "post_remove") and pk_set:
+            created_ats = Post.objects.filter(pk__in=pk_set).values_list(
+                "created_at", flat=True
+            )
+            refresh_tags([instance.pk], *created_ats)
+        elif action == "post_clear":
+            refresh_tags([instance.pk])
+        return
+
+    if action == "pre_clear":
+        setattr(
+            instance, COUNTED_TAGS, list(instance.tags.values_list("pk", flat=True))
+        )
+    elif action in ("post_add", "post_remove"):
+        refresh_tags(pk_set, instance.created_at)
+    elif action == "post_clear":
+        refresh_tags(getattr(instance, COUNTED_TAGS, ()), instance.created_at)
@@ -0,0 +1,107 @@
+from functools import partial
+
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from sage_blog.models import Post, PostTag
+from sage_blog.repository.queryset.post import PostQuerySet
+from sage_blog.search.backends import configure_search_backend, get_search_backend
+from sage_blog.search.postgres import get_trigram_thresholds
+from sage_blog.search.sqlite import (
+    create_full_text_index,
+    has_lost_triggers,
+    is_full_text_search_enabled,
+)
+from sage_blog.search.typeahead import TYPEAHEAD_CACHE_NAMESPACE
+from sage_blog.utils.cache import bump_generation
+
+
+@receiver(connection_created)
+def set_trigram_thresholds(sender, connection, **kwargs):
+    """
+    Applies the configured `pg_trgm` thresholds to every new PostgreSQL session.
+
+    The `%` and `<%` operators compare against these session settings instead of
+    a literal, which is what lets trigram search use its GIN indexes.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    thresholds = get_trigram_thresholds()
+    if not thresholds:
+        return
+
+    assignments = ", ".join("set_config(%s, %s, false)" for _ in thresholds)
+    params = []
+    for name, value in thresholds.items():
+        params.extend((name, str(value)))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {assignments}", params)
+
+
+@receiver(post_migrate)
+def restore_full_text_triggers(sender, app_config, using, **kwargs):
+    """
+    Reinstalls the SQLite FTS5 triggers dropped by migrations rebuilding
+    `sage_post`, such as the `AddField` migrations of django-modeltranslation,
+    and reindexes every post.
+    """
+    connection = connections[using]
+    if app_config.name != "sage_blog" or connection.vendor != "sqlite":
+        return
+    if not is_full_text_search_enabled() or not has_lost_triggers(connection):
+        return
+
+    with connection.schema_editor() as schema_editor:
+        create_full_text_index(None, schema_editor)
+
+
+@receiver(setting_changed)
+def reset_search_backend(sender, setting, **kwargs):
+    """
+    Selects the search backend again when a search setting changes, e.g. in
+    tests overriding `SAGE_BLOG_SEARCH_BACKEND`.
+    """
+    if setting.startswith("SAGE_BLOG_"):
+        configure_search_backend()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post(sender, instance, **kwargs):
+    get_search_backend().remove_post(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_caches(sender, **kwargs):
+    """
+    Drops the search results and counts cached by `PostQuerySet` once the change
+    is committed, so concurrent requests cannot cache it uncommitted.
+    """
+    if kwargs.get("action", "post_").startswith("post_"):
+        for namespace in (
+            PostQuerySet.SEARCH_CACHE_NAMESPACE,
+            PostQuerySet.COUNT_CACHE_NAMESPACE,
+        ):
+            transaction.on_commit(partial(bump_generation, namespace))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=PostTag)
+@receiver(post_delete, sender=PostTag)
+def invalidate_typeahead(sender, **kwargs):
+    """
+    Rebuilds the typeahead prefix indexes and drops their cached suggestions once
+    a post or tag change is committed.
+    """
+    transaction.on_commit(partial(bump_generation, TYPEAHEAD_CACHE_NAMESPACE))
@@ -0,0 +1,31 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..factories import PostCategoryFactory, PostFactory
+
+
+@pytest.mark.django_db
+class TestPostCategoryAdmin:
+
+    url = reverse("admin:sage_blog_postcategory_changelist")
+
+    def test_changelist_query_count_does_not_grow_with_rows(
+        self, admin_client, django_assert_num_queries
+    ):
+        for title in ("Alpine", "Coastal"):
+            PostFactory(category=PostCategoryFactory(title=title), is_published=True)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(self.url)
+        assert response.status_code == 200
+
+        for title in ("Desert", "Forest", "Island", "Lakes", "Tundra"):
+            category = PostCategoryFactory(title=title)
+            PostFactory.create_batch(2, category=category, is_published=True)
+
+        # Post counts are read off the rows, not counted once per category
+        with django_assert_num_queries(len(context.captured_queries)):
+            response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert len(response.context["cl"].result_list) == 7
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..factories import PostCategoryFactory, PostFactory, PostTagFactory
+
+
+@pytest.mark.django_db
+class TestPostAdmin:
+
+    url = reverse("admin:sage_blog_post_changelist")
+
+    def test_changelist_query_count_does_not_grow_with_rows(
+        self, admin_client, django_assert_num_queries
+    ):
+        tags = [PostTagFactory(title="Hiking"), PostTagFactory(title="Camping")]
+        PostFactory(category=PostCategoryFactory(title="Outdoors"), tags=tags)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(self.url)
+        assert response.status_code == 200
+
+        category = PostCategoryFactory(title="Travel")
+        PostFactory.create_batch(6, category=category, tags=tags)
+
+        # Categories are joined and tags prefetched once for the whole page
+        with django_assert_num_queries(len(context.captured_queries)) as queries:
+            response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert len(response.context["cl"].result_list) == 7
+        assert not any(
+            "description" in query["sql"] for query in queries.captured_queries
+        )
+
+    @pytest.mark.parametrize("action", ["stream_export_csv", "stream_export_jsonl"])
+    def test_stream_export_actions_export_selected_posts(self, admin_client, action):
+        category = PostCategoryFactory(title="Exports")
+        tag = PostTagFactory(title="Exported")
+        posts = PostFactory.create_batch(3, category=category, tags=[tag])
+
+        response = admin_client.post(
+            self.url,
+            {"action": action, "_selected_action": [posts[0].pk, posts[2].pk]},
+        )
+        assert response.status_code == 200
+        assert response.streaming
+        content = b"".join(response.streaming_content).decode()
+        assert posts[0].slug in content
+        assert posts[1].slug not in content
+        assert posts[2].slug in content
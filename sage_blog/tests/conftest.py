@@ -1,8 +1,16 @@
 # sage_blog/tests/conftest.py
 
 import pytest
+from django.core.cache import cache
 from .factories import PostCategoryFactory, PostTagFactory, PostFactory, PostFaqFactory
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached searches and fragments must not leak between tests.
+    cache.clear()
+    yield
+    cache.clear()
+
 @pytest.fixture
 def category():
     return PostCategoryFactory()
@@ -3,7 +3,7 @@ from datetime import timedelta
 from django.utils import timezone
 
 from ..factories import PostCategoryFactory, PostFactory
-from sage_blog.models import PostCategory
+from sage_blog.models import Post, PostCategory
 
 
 @pytest.mark.django_db
@@ -107,3 +107,27 @@ class TestCategoryQuerySet:
         queryset = PostCategory.objects.filter_recent_categories(num_categories=1, obj=recent_category)
         assert queryset.count() == 1
         assert old_category in queryset
+
+    def test_post_counts_follow_posts_moving_between_categories(self):
+        category1 = PostCategoryFactory(title="Departures")
+        category2 = PostCategoryFactory(title="Arrivals")
+        post = PostFactory(category=category1, is_published=True)
+        Post.objects.bulk_create(
+            [PostFactory.build(category=category2, is_published=False)]
+        )
+
+        def counts(category):
+            category.refresh_from_db()
+            return category.post_count, category.published_post_count
+
+        assert counts(category1) == (1, 1)
+        assert counts(category2) == (1, 0)
+
+        post.category = category2
+        post.save()
+        assert counts(category1) == (0, 0)
+        assert counts(category2) == (2, 1)
+
+        Post.objects.filter(category=category2).update(category=category1)
+        assert counts(category1) == (2, 1)
+        assert counts(category2) == (0, 0)
@@ -1,10 +1,44 @@
+import csv
+import json
 import pytest
+import tablib
+from asgiref.sync import async_to_sync
+from io import StringIO
 from django.utils import timezone
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.test.utils import CaptureQueriesContext
 from datetime import timedelta
+from modeltranslation.utils import get_language
 
 from ..factories import PostFactory, PostCategoryFactory, PostTagFactory
-from sage_blog.models import Post
+from sage_blog.models import Post, PostTag
+from sage_blog.resources import PostBulkResource, PostResource
+from sage_blog.repository.queryset import PostQuerySet
+from sage_blog.search.backends import (
+    InvertedIndexSearchBackend,
+    get_search_backend,
+    load_search_backend,
+)
+from sage_blog.search.inverted_index import InvertedIndex, MappedInvertedIndex
+from sage_blog.search.mysql import get_match_condition, get_prefix_query
+from sage_blog.search.postgres import create_localized_search_vectors
+from sage_blog.search.sqlite import (
+    FULL_TEXT_TRIGGERS,
+    create_full_text_index,
+    drop_full_text_index,
+    is_full_text_search_enabled,
+)
+from sage_blog.search.typeahead import get_language_lock, get_suggestions
+from sage_blog.signals.search import set_trigram_thresholds
+from sage_blog.utils.cache import bump_generation, get_cache, get_digest, get_or_compute
+from sage_blog.utils.import_export.stream import stream_export, write_export
+from sage_blog.utils.pagination import InvalidCursor, apaginate_by_keyset
+from sage_blog.views.mixins import AsyncSageBlogContextMixin, SageBlogContextMixin
 
 
 @pytest.mark.django_db
@@ -25,6 +59,16 @@ class TestPostQuerySet:
         ]
         return posts
 
+    @pytest.fixture
+    def fts5_index(self, settings):
+        # FTS5 search is opt-in on SQLite, other databases keep their index.
+        if connection.vendor != "sqlite":
+            return
+        settings.SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH = True
+        # SQLite refuses schema editor contexts within the test transaction,
+        # whose rollback removes the index anyway.
+        create_full_text_index(None, connection.schema_editor())
+
     def test_filter_actives_all_published(self, posts):
         queryset = Post.objects.filter_actives(is_published=True)
         assert queryset.count() == 3
@@ -201,6 +245,41 @@ class TestPostQuerySet:
                 prev_post = Post.objects.get(slug=post.prev_post_slug)
                 assert prev_post.pk < post.pk
 
+    def test_navigation_follows_published_order_in_category(
+        self, django_assert_num_queries
+    ):
+        category = PostCategoryFactory(title="Navigation")
+        now = timezone.now()
+        newest = PostFactory(category=category, published_at=now, is_published=True)
+        oldest = PostFactory(
+            category=category, published_at=now - timedelta(days=2), is_published=True
+        )
+        PostFactory(category=category, published_at=now, is_published=False)
+        middle = PostFactory(
+            category=category, published_at=now - timedelta(days=1), is_published=True
+        )
+        PostFactory(
+            category=PostCategoryFactory(title="Elsewhere"),
+            published_at=now - timedelta(days=1),
+            is_published=True,
+        )
+
+        with django_assert_num_queries(1):
+            navigation = Post.objects.get_navigation(middle)
+        assert navigation == {
+            "next": {"slug": newest.slug, "title": newest.title},
+            "prev": {"slug": oldest.slug, "title": oldest.title},
+        }
+        assert Post.objects.get_navigation(oldest)["prev"] is None
+        assert Post.objects.get_navigation(newest)["next"] is None
+
+        posts = Post.objects.filter(category=category).annotate_navigation()
+        assert {post.slug: post.next_post_slug for post in posts} == {
+            oldest.slug: middle.slug,
+            middle.slug: newest.slug,
+            newest.slug: None,
+        }
+
     @pytest.mark.skipif(
         'sqlite3' in settings.DATABASES['default']['ENGINE'],
         reason="These tests require PostgreSQL-specific features."
@@ -296,3 +375,629 @@ class TestPostQuerySet:
     def test_full_text_search_no_query(self, posts):
         queryset = Post.objects.full_text_search("")
         assert queryset.count() == 4
+
+    def test_heavy_search_runs_single_query(self, posts, django_assert_num_queries):
+        post = PostFactory(title="Zanzibar travel notes", category=posts[0].category)
+        with django_assert_num_queries(1):
+            results = list(Post.objects.heavy_search("zanzi"))
+        assert post in results
+        assert len({post.search_strategy for post in results}) == 1
+
+    def test_heavy_search_miss_runs_single_query(self, posts, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            results = list(Post.objects.heavy_search("nonexistentword"))
+        assert results == []
+
+    @pytest.mark.skipif(
+        'postgresql' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the pg_trgm extension."
+    )
+    def test_heavy_search_orders_trigram_hits_by_similarity(self):
+        category = PostCategoryFactory(title="Windmills")
+        description = "Tilting at windmills."
+        closer = PostFactory(
+            title="Quixotic", description=description, category=category
+        )
+        further = PostFactory(
+            title="Quixote", description=description, category=category
+        )
+        results = list(Post.objects.heavy_search("quixotik"))
+        assert results == [closer, further]
+        assert {post.search_strategy for post in results} == {
+            PostQuerySet.TRIGRAM_STRATEGY
+        }
+        assert results[0].rank > results[1].rank
+
+    def test_heavy_search_tags_matching_strategy(self, posts):
+        search_query = posts[0].title[:3]
+        queryset = Post.objects.heavy_search(search_query)
+        assert queryset[0].search_strategy in (
+            PostQuerySet.FULL_TEXT_STRATEGY,
+            PostQuerySet.SUBSTRING_STRATEGY,
+            PostQuerySet.TRIGRAM_STRATEGY,
+        )
+
+    def test_indexed_search_matches_relations_without_joins(
+        self, posts, django_assert_num_queries
+    ):
+        post = PostFactory(
+            title="Coral reef quixotry",
+            category=PostCategoryFactory(title="Xylographs"),
+            tags=[PostTagFactory(title="Zephyrine")],
+        )
+        for search_query in ("quixotry", "quixo", post.slug, "xylograph", "zephyr"):
+            assert list(Post.objects.indexed_search(search_query)) == [post]
+
+        with django_assert_num_queries(3) as captured:
+            list(Post.objects.indexed_search("zephyr"))
+        assert " JOIN " not in captured.captured_queries[-1]["sql"].upper()
+        assert not Post.objects.indexed_search("nothing-matches-this")
+
+    @pytest.mark.skipif(
+        'postgresql' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the PostgreSQL search vector trigger."
+    )
+    def test_full_text_search_stored_vector_follows_updates(self, posts):
+        post = posts[0]
+        Post.objects.filter(pk=post.pk).update(summary="zanzibar archipelago")
+        queryset = Post.objects.full_text_search("zanzibar")
+        assert list(queryset) == [post]
+
+    @pytest.mark.skipif(
+        'postgresql' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the PostgreSQL localized search vector trigger."
+    )
+    def test_localized_search_stems_with_language_config(self, posts, settings):
+        settings.SAGE_BLOG_LOCALIZED_SEARCH = True
+        with connection.schema_editor() as schema_editor:
+            create_localized_search_vectors(None, schema_editor)
+
+        post = posts[0]
+        Post.objects.filter(pk=post.pk).update(title="Snorkeling in the lagoons")
+        assert list(Post.objects.localized_search("snorkeled", language="en")) == [post]
+        assert list(Post.objects.full_text_search("snorkeled")) == [post]
+
+    @pytest.mark.skipif(
+        'postgresql' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the PostgreSQL search trigger."
+    )
+    def test_search_excerpt_is_plain_text(self):
+        post = PostFactory(description="<p>Hello <b>brave</b>\n  new world</p>")
+        post.refresh_from_db()
+        assert post.search_excerpt == "Hello brave new world"
+
+    @pytest.mark.skipif(
+        'postgresql' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the pg_trgm extension."
+    )
+    def test_trigram_similarity_search_uses_configured_threshold(self, settings):
+        post = PostFactory(title="Django for beginners")
+        settings.SAGE_BLOG_TRIGRAM_SIMILARITY_THRESHOLD = 0.9
+        settings.SAGE_BLOG_TRIGRAM_WORD_SIMILARITY_THRESHOLD = 0.9
+        set_trigram_thresholds(None, connection)
+        assert Post.objects.trigram_similarity_search("djang").count() == 0
+
+        settings.SAGE_BLOG_TRIGRAM_WORD_SIMILARITY_THRESHOLD = 0.5
+        set_trigram_thresholds(None, connection)
+        assert list(Post.objects.trigram_similarity_search("djang")) == [post]
+
+    @pytest.mark.skipif(
+        'sqlite3' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the SQLite FTS5 index."
+    )
+    def test_full_text_search_ranks_with_fts5(self, posts, fts5_index):
+        in_description = posts[1]
+        in_title = posts[0]
+        Post.objects.filter(pk=in_description.pk).update(
+            description="<p>A trip to zanzibar</p>"
+        )
+        Post.objects.filter(pk=in_title.pk).update(title="Zanzibar travel notes")
+        queryset = Post.objects.full_text_search("Zanzibar!")
+        assert list(queryset) == [in_title, in_description]
+        assert queryset[0].rank > queryset[1].rank
+        # The ranks are computed by a single full-text query joined to the posts.
+        sql = str(queryset.query)
+        assert sql.count("bm25(") == 1
+        assert "LEFT OUTER JOIN (SELECT rowid AS post_id" in sql
+
+    @pytest.mark.skipif(
+        'sqlite3' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the SQLite FTS5 index."
+    )
+    def test_full_text_search_fts5_index_follows_deletes(self, posts, fts5_index):
+        post = posts[0]
+        Post.objects.filter(pk=post.pk).update(summary="zanzibar archipelago")
+        assert list(Post.objects.heavy_search("zanzibar")) == [post]
+        assert post.pk in Post.objects.full_text_search("zanzibar").values_list(
+            "pk", flat=True
+        )
+        post.delete()
+        assert not Post.objects.full_text_search("zanzibar").exists()
+
+    @pytest.mark.skipif(
+        'sqlite3' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test is for SQLite."
+    )
+    @pytest.mark.skipif(
+        getattr(settings, "SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH", False),
+        reason="FTS5 search is enabled by the settings."
+    )
+    def test_sqlite_full_text_search_is_opt_in(self, posts):
+        assert not is_full_text_search_enabled()
+        post = PostFactory(title="Zanzibar travel notes", category=posts[0].category)
+        assert list(Post.objects.full_text_search("zanzi")) == [post]
+
+    @pytest.mark.skipif(
+        'sqlite3' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the SQLite FTS5 index."
+    )
+    @pytest.mark.django_db(transaction=True)
+    def test_fts5_triggers_are_restored_after_migrations(self, settings):
+        settings.SAGE_BLOG_SQLITE_FULL_TEXT_SEARCH = True
+        with connection.schema_editor() as schema_editor:
+            create_full_text_index(None, schema_editor)
+        try:
+            # Migrations rebuilding `sage_post` drop its triggers.
+            with connection.cursor() as cursor:
+                for trigger in FULL_TEXT_TRIGGERS:
+                    cursor.execute(f"DROP TRIGGER {trigger}")
+            post = PostFactory(
+                title="Zanzibar travel notes",
+                category=PostCategoryFactory(title="Restored"),
+            )
+            assert not Post.objects.full_text_search("zanzibar").exists()
+
+            emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+            assert list(Post.objects.full_text_search("zanzibar")) == [post]
+        finally:
+            with connection.schema_editor() as schema_editor:
+                drop_full_text_index(None, schema_editor)
+
+    def test_mysql_match_condition_targets_fulltext_columns(self):
+        prefix_query = get_prefix_query('+django -"orm*')
+        queryset = Post.objects.filter(
+            Q(get_match_condition("en", prefix_query, boolean=True))
+        )
+        sql = str(queryset.query)
+        assert prefix_query == "django* orm*"
+        assert (
+            'MATCH ("sage_post"."title_en", "sage_post"."summary_en", '
+            '"sage_post"."description_en") AGAINST (django* orm* IN BOOLEAN MODE) > '
+        ) in sql
+
+    @pytest.mark.skipif(
+        'postgresql' not in settings.DATABASES['default']['ENGINE'],
+        reason="This test requires the PostgreSQL search vector trigger."
+    )
+    def test_ranked_search_weights_title_over_description(self, posts):
+        in_description = posts[1]
+        in_title = posts[2]
+        Post.objects.filter(pk=in_description.pk).update(
+            description="<p>A trip to zanzibar</p>"
+        )
+        Post.objects.filter(pk=in_title.pk).update(title="Zanzibar travel notes")
+        queryset = Post.objects.ranked_search("zanzibar")
+        assert list(queryset) == [in_title, in_description]
+        assert queryset[0].rank > queryset[1].rank
+
+    @pytest.mark.skipif(
+        not any(
+            vendor in settings.DATABASES['default']['ENGINE']
+            for vendor in ('postgresql', 'sqlite3', 'mysql')
+        ),
+        reason="This test requires a search backend ranking its matches."
+    )
+    def test_ranked_search_limit_returns_top_k(
+        self, posts, fts5_index, django_assert_num_queries
+    ):
+        for post in posts:
+            Post.objects.filter(pk=post.pk).update(summary="zanzibar archipelago")
+        Post.objects.filter(pk=posts[3].pk).update(title="Zanzibar travel notes")
+        with django_assert_num_queries(1):
+            results = list(Post.objects.ranked_search("zanzibar", limit=2))
+        assert len(results) == 2
+        assert results[0] == posts[3]
+        assert results[0].rank > results[1].rank
+
+    def test_inverted_index_backend_is_selected_from_settings(self, posts, settings):
+        settings.SAGE_BLOG_SEARCH_BACKEND = "inverted_index"
+        assert isinstance(get_search_backend(), InvertedIndexSearchBackend)
+
+        category = posts[0].category
+        in_description = PostFactory(
+            description="<p>A trip to Zanzibar</p>", category=category
+        )
+        in_title = PostFactory(title="Zanzibar travel notes", category=category)
+        assert list(Post.objects.full_text_search("zanzibar")) == [
+            in_title,
+            in_description,
+        ]
+        assert list(Post.objects.trigram_similarity_search("zanzi"))[0] == in_title
+
+        in_title.delete()
+        assert list(Post.objects.heavy_search("zanzibar")) == [in_description]
+
+    def test_inverted_index_backend_keeps_the_best_candidates(self, posts, settings):
+        settings.SAGE_BLOG_SEARCH_BACKEND = "inverted_index"
+        settings.SAGE_BLOG_SEARCH_MAX_CANDIDATES = 2
+        category = posts[0].category
+        in_title = PostFactory(title="Zanzibar travel notes", category=category)
+        in_descriptions = PostFactory.create_batch(
+            3, description="<p>A trip to Zanzibar</p>", category=category
+        )
+
+        assert list(Post.objects.full_text_search("zanzibar")) == [
+            in_title,
+            in_descriptions[-1],
+        ]
+        assert len(Post.objects.trigram_similarity_search("zanzi")) == 2
+
+    def test_unknown_search_backend_is_rejected(self):
+        with pytest.raises(ImproperlyConfigured):
+            load_search_backend("sage_blog.search.backends.MissingBackend")
+
+    def test_mapped_inverted_index_matches_memory_index(self, posts, tmp_path):
+        PostFactory(
+            title="Zanzibar travel notes",
+            summary="Ferries to Zanzibar",
+            category=posts[0].category,
+        )
+        index = InvertedIndex()
+        index.build(Post.objects.all())
+        path = tmp_path / "posts.idx"
+        index.save(path)
+
+        with MappedInvertedIndex(path) as mapped:
+            assert mapped.document_count == index.document_count == 5
+            for query in ("zanzibar", "zanzibar notes", "zan", "nonexistentword"):
+                assert mapped.search(query) == pytest.approx(index.search(query))
+                assert mapped.prefix_search(query) == pytest.approx(
+                    index.prefix_search(query)
+                )
+        assert InvertedIndex.load(path).search("zanzibar") == pytest.approx(
+            index.search("zanzibar")
+        )
+
+    def test_persisted_inverted_index_follows_writes(
+        self, posts, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        path = tmp_path / "posts.idx"
+        log_path = tmp_path / "posts.idx.log"
+        call_command("build_search_index", path=str(path), stdout=None)
+        settings.SAGE_BLOG_SEARCH_INDEX_PATH = str(path)
+        settings.SAGE_BLOG_SEARCH_BACKEND = "inverted_index"
+        assert get_search_backend().mapped_index is not None
+        assert not Post.objects.full_text_search("zanzibar").exists()
+        built = path.stat()
+
+        # Writes are appended to the log, the index file is left untouched.
+        with django_capture_on_commit_callbacks(execute=True):
+            post = PostFactory(
+                title="Zanzibar travel notes", category=posts[0].category
+            )
+            Post.objects.get(pk=posts[0].pk).delete()
+        assert list(Post.objects.heavy_search("zanzibar")) == [post]
+        assert path.stat().st_mtime_ns == built.st_mtime_ns
+        logged = {json.loads(line)["id"] for line in log_path.read_text().splitlines()}
+        assert logged == {post.pk, posts[0].pk}
+
+        # Other processes replay the log over the same file.
+        other = InvertedIndexSearchBackend(str(path))
+        assert set(other.get_scores(Post.objects.all(), "zanzibar")) == {post.pk}
+        assert other.get_mapped_index(Post).document_count == 4
+
+        call_command("build_search_index", path=str(path), stdout=None)
+        assert log_path.read_text() == ""
+        assert list(Post.objects.full_text_search("zanzibar")) == [post]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.delete()
+        assert not Post.objects.full_text_search("zanzibar").exists()
+        assert set(other.get_scores(Post.objects.all(), "zanzibar")) == set()
+
+    def test_persisted_inverted_index_is_not_built_by_writes(
+        self, posts, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        path = tmp_path / "posts.idx"
+        settings.SAGE_BLOG_SEARCH_INDEX_PATH = str(path)
+        settings.SAGE_BLOG_SEARCH_BACKEND = "inverted_index"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post = PostFactory(
+                title="Zanzibar travel notes", category=posts[0].category
+            )
+        assert not path.exists()
+
+        # The first search builds the file, which already holds the post.
+        assert list(Post.objects.full_text_search("zanzibar")) == [post]
+        assert path.exists()
+        assert (tmp_path / "posts.idx.log").read_text() == ""
+
+    def test_cached_heavy_search_hit_runs_single_query(
+        self, posts, django_assert_num_queries
+    ):
+        post = PostFactory(
+            title="Zanzibar travel notes",
+            is_published=True,
+            category=posts[0].category,
+        )
+        published = Post.objects.filter(is_published=True)
+        expected = list(published.heavy_search("zanzibar"))
+        assert list(published.cached_heavy_search("  Zanzibar ")) == expected
+
+        with django_assert_num_queries(1):
+            results = list(published.cached_heavy_search("zanzibar"))
+        assert results == [post]
+        assert results[0].search_strategy == expected[0].search_strategy
+
+    def test_cached_heavy_search_is_invalidated_by_writes(
+        self, posts, django_capture_on_commit_callbacks
+    ):
+        assert not Post.objects.cached_heavy_search("zanzibar").exists()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post = PostFactory(
+                title="Zanzibar travel notes", category=posts[0].category
+            )
+        assert list(Post.objects.cached_heavy_search("zanzibar")) == [post]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.delete()
+        assert not Post.objects.cached_heavy_search("zanzibar").exists()
+
+    def test_typeahead_suggests_tags_and_posts_by_word_prefix(
+        self, posts, django_capture_on_commit_callbacks, django_assert_num_queries
+    ):
+        category = posts[0].category
+        with django_capture_on_commit_callbacks(execute=True):
+            tag = PostTagFactory(title="Diving", is_published=True)
+            post = PostFactory(
+                title="Night dives in Bali", is_published=True, category=category
+            )
+            PostFactory(title="Dives we skipped", is_published=False, category=category)
+
+        assert get_suggestions("d") == []
+        suggestions = get_suggestions("DIV")
+        assert [suggestion["slug"] for suggestion in suggestions] == [
+            tag.slug,
+            post.slug,
+        ]
+        assert suggestions[1] == {"kind": "post", "slug": post.slug, "title": post.title}
+
+        with django_assert_num_queries(0):
+            assert get_suggestions("div ") == suggestions
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post.delete()
+        assert [suggestion["slug"] for suggestion in get_suggestions("div")] == [
+            tag.slug
+        ]
+
+    def test_typeahead_serves_stale_index_during_rebuild(
+        self, posts, django_capture_on_commit_callbacks
+    ):
+        category = posts[0].category
+        with django_capture_on_commit_callbacks(execute=True):
+            first = PostFactory(
+                title="Kayaking the fjords", is_published=True, category=category
+            )
+        assert [suggestion["slug"] for suggestion in get_suggestions("kay")] == [
+            first.slug
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            second = PostFactory(
+                title="Kayak packing list", is_published=True, category=category
+            )
+        lock = get_language_lock(get_language())
+        lock.acquire()
+        try:
+            assert [suggestion["slug"] for suggestion in get_suggestions("kay")] == [
+                first.slug
+            ]
+        finally:
+            lock.release()
+
+        assert [suggestion["slug"] for suggestion in get_suggestions("kay")] == [
+            second.slug,
+            first.slug,
+        ]
+
+    def test_keyset_paginate_walks_pages_in_both_directions(
+        self, django_assert_num_queries
+    ):
+        category = PostCategoryFactory(title="Keyset")
+        now = timezone.now()
+        posts = [
+            PostFactory(published_at=now - timedelta(days=day), category=category)
+            for day in range(5)
+        ]
+        posts.append(PostFactory(published_at=posts[2].published_at, category=category))
+        expected = sorted(
+            posts, key=lambda post: (post.published_at, post.pk), reverse=True
+        )
+
+        with django_assert_num_queries(1):
+            first = Post.objects.keyset_paginate(per_page=4)
+        assert list(first) == expected[:4]
+        assert not first.has_previous()
+
+        with django_assert_num_queries(1):
+            second = Post.objects.keyset_paginate(first.next_cursor, per_page=4)
+        assert list(second) == expected[4:]
+        assert not second.has_next()
+
+        back = Post.objects.keyset_paginate(second.previous_cursor, per_page=4)
+        assert list(back) == expected[:4]
+        assert not back.has_previous() and back.has_next()
+
+    def test_keyset_paginate_rejects_invalid_cursor(self):
+        with pytest.raises(InvalidCursor):
+            Post.objects.keyset_paginate("not-a-cursor")
+
+    def test_cached_count_is_invalidated_by_writes(
+        self, posts, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        published = Post.objects.filter(is_published=True)
+        assert published.cached_count() == 3
+        with django_assert_num_queries(0):
+            assert published.cached_count() == 3
+        assert Post.objects.cached_count() == 4
+
+        with django_capture_on_commit_callbacks(execute=True):
+            PostFactory(is_published=True, category=posts[0].category)
+        assert published.cached_count() == 4
+
+    def test_estimated_count_falls_back_to_exact_count(self, posts, settings):
+        assert Post.objects.estimated_count() == 4
+        assert Post.objects.filter(is_published=True).estimated_count() == 3
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE sage_post")
+            settings.SAGE_BLOG_COUNT_ESTIMATE_THRESHOLD = 1
+            assert Post.objects.estimated_count() == 4
+
+    def test_sidebar_context_is_cached_until_content_changes(
+        self, posts, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        view = SageBlogContextMixin()
+        # Caching is opt-in, the context holds querysets by default.
+        for name in ("sage_blog_categories", "sage_blog_recent_posts", "sage_blog_tags"):
+            assert isinstance(view.get_context_data()[name], QuerySet)
+
+        view.sidebar_cache_timeout = 60
+        context = view.get_context_data()
+        with django_assert_num_queries(0):
+            assert view.get_context_data() == context
+
+        class OtherView(SageBlogContextMixin):
+            sidebar_cache_timeout = 60
+
+        with django_assert_num_queries(3):
+            OtherView().get_context_data()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            post = PostFactory(category=posts[0].category)
+        assert view.get_context_data()["sage_blog_recent_posts"][0] == post
+
+    def test_stale_entry_is_served_while_another_worker_recomputes(self):
+        cache_parts = ("sidebar-test",)
+        assert get_or_compute("test", cache_parts, lambda: "first", 60) == "first"
+        bump_generation("test")
+        lock_key = f"sage_blog:test:{get_digest(cache_parts)}:lock"
+        get_cache().add(lock_key, True)
+
+        assert get_or_compute("test", cache_parts, lambda: "second", 60) == "first"
+        get_cache().delete(lock_key)
+        assert get_or_compute("test", cache_parts, lambda: "second", 60) == "second"
+
+    def test_async_sidebar_context_matches_sync_context(self, posts):
+        view = AsyncSageBlogContextMixin()
+        context = async_to_sync(view.aget_context_data)()
+        sync_context = SageBlogContextMixin.get_context_data(view)
+        for name in ("sage_blog_categories", "sage_blog_recent_posts", "sage_blog_tags"):
+            assert context[name] == list(sync_context[name])
+
+        view.sidebar_cache_timeout = 60
+        assert async_to_sync(view.aget_context_data)() == context
+
+    def test_async_keyset_paginate_matches_sync_pages(self, posts):
+        first = async_to_sync(apaginate_by_keyset)(Post.objects.all(), per_page=3)
+        assert list(first) == list(Post.objects.keyset_paginate(per_page=3))
+        second = async_to_sync(apaginate_by_keyset)(
+            Post.objects.all(), first.next_cursor, per_page=3
+        )
+        assert list(second) == list(
+            Post.objects.keyset_paginate(first.next_cursor, per_page=3)
+        )
+
+    def test_stream_export_prefetches_each_chunk(
+        self, posts, django_assert_max_num_queries
+    ):
+        file = StringIO()
+        # Two chunks of posts, each prefetching tags and suggested and related
+        # posts, PostgreSQL reads the chunks from a single server-side cursor.
+        with django_assert_max_num_queries(8):
+            rows = write_export(file, PostResource(), chunk_size=3)
+        assert rows == 4
+
+        lines = list(csv.DictReader(StringIO(file.getvalue())))
+        exported = {line["title"]: line for line in lines}
+        for post in posts:
+            assert exported[post.title]["category"] == post.category.title
+            assert exported[post.title]["tags"] == post.tags.get().title
+
+        jsonl = [json.loads(line) for line in stream_export(PostResource(), None, "jsonl")]
+        assert [line["title"] for line in jsonl] == [line["title"] for line in lines]
+
+    def test_export_blog_data_writes_every_post(self, posts, tmp_path):
+        path = tmp_path / "posts.jsonl"
+        stderr = StringIO()
+        call_command(
+            "export_blog_data", "posts", format="jsonl", output=str(path),
+            chunk_size=3, stderr=stderr,
+        )
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert sorted(line["title"] for line in lines) == sorted(
+            post.title for post in posts
+        )
+        assert "Exported 4 posts" in stderr.getvalue()
+
+        stdout = StringIO()
+        call_command("export_blog_data", "posts", stdout=stdout, stderr=StringIO())
+        assert len(list(csv.DictReader(StringIO(stdout.getvalue())))) == 4
+
+    def test_bulk_import_batch_size_follows_settings(self, settings):
+        default_batch_size = PostBulkResource._meta.batch_size
+        settings.SAGE_BLOG_IMPORT_BATCH_SIZE = 2
+        assert PostBulkResource()._meta.batch_size == 2
+        settings.SAGE_BLOG_IMPORT_BATCH_SIZE = 5
+        assert PostBulkResource()._meta.batch_size == 5
+        # The options shared by the class are left untouched.
+        assert PostBulkResource._meta.batch_size == default_batch_size
+
+    def test_bulk_import_saves_posts_and_tags_in_batches(self, posts):
+        category = PostCategoryFactory(title="Imported")
+        tag = PostTagFactory(title="Imported")
+        other_tag = posts[1].tags.get()
+
+        def import_posts(*titles):
+            headers = ["title", "category", "tags", "is_published", "summary"]
+            rows = [
+                (title, "Imported", f"Imported;{other_tag.title}", "1", "Summary")
+                for title in titles
+            ]
+            # An existing post moves to the imported category and tag.
+            rows.append((posts[0].title, "Imported", "Imported", "0", "Summary"))
+            dataset = tablib.Dataset(*rows, headers=headers)
+            with CaptureQueriesContext(connection) as queries:
+                result = PostBulkResource().import_data(dataset, raise_errors=True)
+            assert not result.has_errors()
+            # SQLite splits inserts of wide rows by its parameter limit.
+            return len(
+                [
+                    query
+                    for query in queries
+                    if not query["sql"].startswith('INSERT INTO "sage_post" (')
+                ]
+            )
+
+        # Lookups and saves are batched, so the query count does not grow per row.
+        assert import_posts("Imported one", "Imported two") == import_posts(
+            *(f"Imported post {number}" for number in range(10))
+        )
+
+        post = Post.objects.get(title="Imported one")
+        assert post.slug == "imported-one"
+        assert post.category == category
+        assert set(post.tags.all()) == {tag, other_tag}
+        posts[0].refresh_from_db()
+        assert (posts[0].is_published, posts[0].category) == (False, category)
+        assert list(posts[0].tags.all()) == [tag]
+
+        tag.refresh_from_db()
+        category.refresh_from_db()
+        assert (tag.post_count, tag.published_post_count) == (13, 12)
+        assert (category.post_count, category.published_post_count) == (13, 12)
+        assert PostTag.objects.get(pk=posts[2].tags.get().pk).post_count == 1
@@ -1,8 +1,12 @@
 import pytest
 from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from ..factories import PostTagFactory, PostFactory, PostCategoryFactory
-from sage_blog.models import PostTag
+from sage_blog.models import Post, PostTag, PostTagUsage
 
 @pytest.mark.django_db
 class TestTagQuerySet:
@@ -110,3 +114,144 @@ class TestTagQuerySet:
         tag_with_no_posts = tags[2]  # This tag was created without posts
         queryset = PostTag.objects.sort_by_popularity()
         assert queryset.last() == tag_with_no_posts
+
+    def test_post_counts_follow_post_and_tag_changes(self):
+        category = PostCategoryFactory(title="Counters")
+        tag1 = PostTagFactory(title="Counted")
+        tag2 = PostTagFactory(title="Recounted")
+        post = PostFactory(is_published=True, tags=[tag1, tag2], category=category)
+        PostFactory(is_published=False, tags=[tag1], category=category)
+
+        def counts(tag):
+            tag.refresh_from_db()
+            return tag.post_count, tag.published_post_count
+
+        assert counts(tag1) == (2, 1)
+        assert counts(tag2) == (1, 1)
+
+        post.is_published = False
+        post.save()
+        assert counts(tag1) == (2, 0)
+
+        post.tags.remove(tag1)
+        assert counts(tag1) == (1, 0)
+        tag1.posts.add(post)
+        assert counts(tag1) == (2, 0)
+
+        post.tags.clear()
+        assert counts(tag2) == (0, 0)
+        post.tags.add(tag2)
+        Post.objects.filter(pk=post.pk).update(is_published=True)
+        assert counts(tag2) == (1, 1)
+
+        post.delete()
+        assert counts(tag2) == (0, 0)
+
+    def test_tag_usage_follows_post_and_tag_changes(self):
+        category = PostCategoryFactory(title="Usage")
+        tag = PostTagFactory(title="Usage")
+        post = PostFactory(is_published=True, tags=[tag], category=category)
+        old_post = PostFactory(is_published=False, tags=[tag], category=category)
+        Post.objects.filter(pk=old_post.pk).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+
+        def buckets():
+            return list(
+                PostTagUsage.objects.filter(tag=tag)
+                .order_by("day")
+                .values_list("post_count", "published_post_count")
+            )
+
+        assert buckets() == [(1, 0), (1, 1)]
+        trend = PostTag.objects.filter_trend_tags(days_ago=7, min_count=1)
+        assert [(t, t.recent_count) for t in trend] == [(tag, 1)]
+
+        post.is_published = False
+        post.save()
+        assert buckets() == [(1, 0), (1, 0)]
+
+        post.tags.remove(tag)
+        assert buckets() == [(1, 0)]
+        assert not PostTag.objects.filter_trend_tags(days_ago=7, min_count=1).exists()
+
+        old_post.refresh_from_db()
+        old_post.delete()
+        assert buckets() == []
+
+    def test_sort_by_trend_score_decays_old_posts(self):
+        category = PostCategoryFactory(title="Trends")
+        old_tag = PostTagFactory(title="Faded")
+        new_tag = PostTagFactory(title="Rising")
+        PostTagFactory(title="Unused")
+        old_posts = PostFactory.create_batch(
+            3, is_published=True, tags=[old_tag], category=category
+        )
+        Post.objects.filter(pk__in=[post.pk for post in old_posts]).update(
+            created_at=timezone.now() - timedelta(days=28)
+        )
+        post = PostFactory(is_published=True, tags=[new_tag], category=category)
+
+        trending = list(PostTag.objects.sort_by_trend_score())
+        assert trending == [new_tag, old_tag]
+        assert trending[0].trending_score == pytest.approx(1)
+        assert trending[1].trending_score == pytest.approx(3 / 16)
+
+        post.is_published = False
+        post.save()
+        assert list(PostTag.objects.sort_by_trend_score()) == [old_tag]
+
+    def test_refresh_trend_scores_repairs_scores(self):
+        category = PostCategoryFactory(title="Trends")
+        tag = PostTagFactory(title="Repaired")
+        PostFactory(is_published=True, tags=[tag], category=category)
+        PostTag.objects.update(trend_score=None)
+
+        call_command("refresh_trend_scores", stdout=StringIO())
+        assert PostTag.objects.sort_by_trend_score().get() == tag
+
+    def test_filter_top_published_tags_counts_published_posts(self):
+        category = PostCategoryFactory(title="Sidebar")
+        busy = PostTagFactory(title="Busy", is_published=True)
+        quiet = PostTagFactory(title="Quiet", is_published=True)
+        hidden = PostTagFactory(title="Hidden", is_published=False)
+        PostFactory.create_batch(
+            3, is_published=False, tags=[busy, quiet], category=category
+        )
+        PostFactory.create_batch(
+            2, is_published=True, tags=[busy, hidden], category=category
+        )
+        PostFactory(is_published=True, tags=[quiet], category=category)
+        old = PostFactory(is_published=True, tags=[quiet], category=category)
+        Post.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+
+        for days_ago, joins, expected in (
+            (0, 0, [(busy, 2), (quiet, 2)]),
+            (7, 1, [(busy, 2), (quiet, 1)]),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                tags = list(
+                    PostTag.objects.filter_top_published_tags(
+                        limit=5, days_ago=days_ago
+                    )
+                )
+            assert [(tag, tag.total_posts) for tag in tags] == expected
+            assert len(queries) == 1
+            assert queries[0]["sql"].upper().count(" JOIN ") == joins
+
+        assert PostTag.objects.filter_top_published_tags(min_count=3).count() == 0
+
+    def test_rebuild_post_counts_repairs_counters(self):
+        tag = PostTagFactory(title="Rebuilt")
+        PostFactory(
+            is_published=True, tags=[tag], category=PostCategoryFactory(title="Rebuilt")
+        )
+        PostTag.objects.update(post_count=0, published_post_count=0)
+        PostTagUsage.objects.all().delete()
+
+        call_command("rebuild_post_counts", stdout=StringIO())
+        tag.refresh_from_db()
+        assert (tag.post_count, tag.published_post_count) == (1, 1)
+        assert tag.usage.get().post_count == 1
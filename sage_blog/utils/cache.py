@@ -0,0 +1,142 @@
+"""
+Generation counters for the caches of the blog.
+
+Cached entries embed the current generation of their namespace in their key.
+Bumping the generation, e.g. when a post changes, makes every entry of the
+namespace unreachable at once without having to know their keys; the stale
+entries simply expire. The cache alias is configured with `SAGE_BLOG_CACHE_ALIAS`.
+
+`get_or_compute` instead records the generation inside the entry, so a stale
+entry keeps being served while a single worker recomputes it.
+"""
+
+import hashlib
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = "sage_blog"
+
+# Namespace of the sidebar entries of `SageBlogContextMixin`.
+SIDEBAR_CACHE_NAMESPACE = "sidebar"
+
+# How long a worker may hold the right to recompute an entry, and how long the
+# other workers wait for a missing entry before computing it themselves.
+LOCK_TIMEOUT = 30
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+
+def get_cache():
+    return caches[getattr(settings, "SAGE_BLOG_CACHE_ALIAS", "default")]
+
+
+def get_generation_key(namespace):
+    return f"{KEY_PREFIX}:{namespace}:generation"
+
+
+def get_generation(namespace):
+    """
+    Returns the current generation of a namespace, starting a missing counter.
+    """
+    cache = get_cache()
+    key = get_generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        generation = start_generation(key)
+    return generation
+
+
+def bump_generation(namespace):
+    """
+    Invalidates every entry cached under a namespace.
+    """
+    cache = get_cache()
+    key = get_generation_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return start_generation(key)
+
+
+def start_generation(key):
+    # Counters start from the clock, so a counter that was evicted restarts
+    # past the generations of the entries that may still be cached, including
+    # the ones held in process memory such as the typeahead indexes. The clock
+    # is read in nanoseconds as counters can be bumped several times within a
+    # millisecond.
+    cache = get_cache()
+    generation = time.time_ns()
+    cache.add(key, generation, timeout=None)
+    return cache.get(key, generation)
+
+
+def make_cache_key(namespace, *parts):
+    """
+    Builds a key of the current generation of a namespace from arbitrary parts.
+
+    The parts are hashed so keys stay short and safe for every cache backend.
+    """
+    return f"{KEY_PREFIX}:{namespace}:{get_generation(namespace)}:{get_digest(parts)}"
+
+
+def get_digest(parts):
+    return hashlib.md5(
+        "\x1f".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def get_or_compute(namespace, parts, compute, timeout):
+    """
+    Returns the value cached for `parts` in a namespace, calling `compute` to
+    refresh it once it is older than `timeout` seconds or its namespace
+    generation was bumped.
+
+    Only the worker winning a lock recomputes an entry; the others keep serving
+    the stale value meanwhile, or wait up to `LOCK_WAIT` seconds for it when
+    there is none yet, so an expiry or invalidation triggers a single
+    computation instead of a stampede.
+    """
+    cache = get_cache()
+    key = f"{KEY_PREFIX}:{namespace}:{get_digest(parts)}"
+    generation = get_generation(namespace)
+    entry = cache.get(key)
+    if entry is not None:
+        entry_generation, refresh_at, value = entry
+        if entry_generation == generation and refresh_at > time.time():
+            return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, True, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            # Entries outlive their refresh time so they can be served stale.
+            cache.set(key, (generation, time.time() + timeout, value), timeout * 2)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    if entry is not None:
+        return entry[2]
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[2]
+    return compute()
+
+
+async def aget_or_compute(namespace, parts, compute, timeout):
+    """
+    Asynchronous `get_or_compute`, where `compute` is a coroutine function.
+
+    The cache is read and waited on in a worker thread, while `compute` still
+    runs on the calling event loop.
+    """
+    return await sync_to_async(get_or_compute)(
+        namespace, parts, async_to_sync(compute), timeout
+    )
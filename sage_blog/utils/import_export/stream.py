@@ -0,0 +1,122 @@
+"""
+Streaming exports of import-export resources.
+
+`ModelResource.export()` builds a whole `tablib.Dataset` in memory before
+anything is written. The functions below instead read objects with
+`QuerySet.iterator(chunk_size=...)`, which also runs the `prefetch_related`
+lookups of the queryset once per chunk, and render every row as soon as it is
+read, so memory stays bounded by the chunk size whatever the number of rows.
+
+Rows are written as CSV or as JSON lines, either to a file or to a
+`StreamingHttpResponse`.
+"""
+
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class InvalidExportFormat(ValueError):
+    pass
+
+
+class Echo:
+    """
+    A file-like object returning what is written, so `csv.writer` renders rows
+    without buffering them.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_export_chunk_size():
+    return getattr(settings, "SAGE_BLOG_EXPORT_CHUNK_SIZE", 2000)
+
+
+def iter_export_rows(resource, queryset=None, chunk_size=None):
+    """
+    Yields the export headers of a resource, then the exported row of every
+    object of `queryset`, or of the resource queryset.
+
+    The queryset goes through `resource.filter_export()`, where resources add
+    the `select_related` and `prefetch_related` lookups of their fields.
+    """
+    if queryset is None:
+        queryset = resource.get_queryset()
+    queryset = resource.filter_export(queryset)
+    if not queryset.ordered:
+        queryset = queryset.order_by("pk")
+
+    yield resource.get_export_headers()
+    for obj in queryset.iterator(chunk_size=chunk_size or get_export_chunk_size()):
+        yield resource.export_resource(obj)
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    rows = iter(rows)
+    headers = next(rows)
+    for row in rows:
+        yield json.dumps(
+            dict(zip(headers, row)), cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + "\n"
+
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+}
+
+
+def stream_export(resource, queryset=None, file_format="csv", chunk_size=None):
+    """
+    Yields the lines of an export in `file_format`, one of `EXPORT_WRITERS`.
+
+    Raises `InvalidExportFormat` for unknown formats.
+    """
+    if file_format not in EXPORT_WRITERS:
+        raise InvalidExportFormat(
+            f"Unknown export format {file_format!r}, expected one of "
+            f"{', '.join(EXPORT_WRITERS)}."
+        )
+    rows = iter_export_rows(resource, queryset, chunk_size)
+    return EXPORT_WRITERS[file_format](rows)
+
+
+def write_export(file, resource, queryset=None, file_format="csv", chunk_size=None):
+    """
+    Writes an export to a text file and returns the number of rows written.
+    """
+    lines = 0
+    for line in stream_export(resource, queryset, file_format, chunk_size):
+        file.write(line)
+        lines += 1
+    # The CSV header line is not a row.
+    return lines - 1 if file_format == "csv" else lines
+
+
+def get_export_response(resource, queryset=None, file_format="csv", filename=None):
+    """
+    Returns a `StreamingHttpResponse` downloading an export as an attachment.
+    """
+    lines = stream_export(resource, queryset, file_format)
+    response = StreamingHttpResponse(
+        lines, content_type=EXPORT_CONTENT_TYPES[file_format]
+    )
+    filename = filename or f"{resource._meta.model._meta.model_name}s"
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
@@ -9,3 +9,51 @@ class ForeignKeyNullableWidget(widgets.ForeignKeyWidget):
         if value:
             return super().clean(value)
         return None
+
+
+class CachedLookupMixin:
+    """
+    Resolves values against a `{value: instance}` map of the whole related
+    table, loaded by the first lookup, instead of querying once per value.
+
+    Meant for small related tables such as categories and tags. Call
+    `clear_cache()` before each import so objects created since are found.
+    """
+
+    _instances = None
+
+    def clear_cache(self):
+        self._instances = None
+
+    def get_cached_instances(self):
+        if self._instances is None:
+            queryset = self.model.objects.only(self.model._meta.pk.name, self.field)
+            self._instances = {
+                str(getattr(obj, self.field)): obj for obj in queryset.iterator()
+            }
+        return self._instances
+
+
+class CachedForeignKeyWidget(CachedLookupMixin, widgets.ForeignKeyWidget):
+    def get_instance_by_lookup_fields(self, value, row, **kwargs):
+        try:
+            return self.get_cached_instances()[str(value).strip()]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                f"{self.model._meta.object_name} matching {self.field}={value!r} "
+                "does not exist."
+            ) from None
+
+
+class CachedManyToManyWidget(CachedLookupMixin, widgets.ManyToManyWidget):
+    def clean(self, value, row=None, **kwargs):
+        # Unknown values are skipped, as `ManyToManyWidget` filters them out.
+        if not value:
+            return []
+        instances = self.get_cached_instances()
+        values = str(value).split(self.separator)
+        return [
+            instances[value]
+            for value in dict.fromkeys(value.strip() for value in values)
+            if value in instances
+        ]
@@ -0,0 +1,169 @@
+"""
+Paginators avoiding the costs of offset pagination.
+
+Keyset pagination, also known as cursor pagination, reads pages by seeking
+past the `(published_at, id)` of the last post of the previous page rather than
+skipping `OFFSET` rows, and no `COUNT(*)` is run, so page 500 costs the same
+single indexed query as page 1. Pages are addressed by opaque cursors instead
+of page numbers.
+
+Numbered pages can keep their `COUNT(*)` out of most requests with the
+`COUNT_PAGINATORS`, which read cached or estimated totals instead.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(post, direction):
+    payload = json.dumps(
+        [direction, post.published_at.isoformat(), post.pk], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Returns the `(direction, published_at, pk)` encoded in a cursor.
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, published_at, pk = json.loads(payload)
+        published_at = datetime.fromisoformat(published_at)
+    except (TypeError, ValueError) as error:
+        raise InvalidCursor(f"Invalid cursor {cursor!r}.") from error
+    if direction not in (NEXT, PREVIOUS) or not isinstance(pk, int):
+        raise InvalidCursor(f"Invalid cursor {cursor!r}.")
+    return direction, published_at, pk
+
+
+class KeysetPage:
+    """
+    A page of posts, newest first, with the cursors of its neighbour pages.
+
+    It mimics the parts of Django's `Page` that do not need a total count.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self.object_list)} posts>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_keyset(queryset, cursor=None, per_page=15):
+    """
+    Returns the `KeysetPage` of `queryset` designated by `cursor`, the first page
+    when `cursor` is empty, ordering posts by descending `(published_at, id)`.
+
+    Raises `InvalidCursor` when the cursor cannot be decoded.
+    """
+    direction, queryset = get_keyset_queryset(queryset, cursor, per_page)
+    return get_keyset_page(list(queryset), direction, cursor, per_page)
+
+
+async def apaginate_by_keyset(queryset, cursor=None, per_page=15):
+    """
+    Asynchronous `paginate_by_keyset`.
+    """
+    direction, queryset = get_keyset_queryset(queryset, cursor, per_page)
+    posts = [post async for post in queryset]
+    return get_keyset_page(posts, direction, cursor, per_page)
+
+
+def get_keyset_queryset(queryset, cursor, per_page):
+    direction = NEXT
+    if cursor:
+        direction, published_at, pk = decode_cursor(cursor)
+        older = Q(published_at__lt=published_at) | Q(
+            published_at=published_at, pk__lt=pk
+        )
+        newer = Q(published_at__gt=published_at) | Q(
+            published_at=published_at, pk__gt=pk
+        )
+        queryset = queryset.filter(older if direction == NEXT else newer)
+
+    if direction == NEXT:
+        queryset = queryset.order_by("-published_at", "-pk")
+    else:
+        queryset = queryset.order_by("published_at", "pk")
+
+    # One extra post tells whether there is a page beyond this one.
+    return direction, queryset[: per_page + 1]
+
+
+def get_keyset_page(posts, direction, cursor, per_page):
+    has_more = len(posts) > per_page
+    posts = posts[:per_page]
+    if direction == PREVIOUS:
+        posts.reverse()
+
+    if not posts:
+        return KeysetPage(posts)
+
+    has_next = has_more if direction == NEXT else True
+    has_previous = bool(cursor) if direction == NEXT else has_more
+    return KeysetPage(
+        posts,
+        next_cursor=encode_cursor(posts[-1], NEXT) if has_next else None,
+        previous_cursor=encode_cursor(posts[0], PREVIOUS) if has_previous else None,
+    )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    A paginator reading the total of a `PostQuerySet` from `cached_count`.
+    """
+
+    @cached_property
+    def count(self):
+        return self.object_list.cached_count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator reading the total of a `PostQuerySet` from `estimated_count`,
+    so the last page number of unfiltered listings is approximate.
+    """
+
+    @cached_property
+    def count(self):
+        return self.object_list.estimated_count()
+
+
+COUNT_PAGINATORS = {
+    "cached": CachedCountPaginator,
+    "estimated": EstimatedCountPaginator,
+}
@@ -1,3 +1,4 @@
-from .context import SageBlogContextMixin
+from .context import AsyncSageBlogContextMixin, SageBlogContextMixin
 from .pagination import PaginatedMixin
 from .search import SearchableMixin
+from .typeahead import TypeaheadMixin
@@ -1,6 +1,14 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.views.generic.base import ContextMixin
+from modeltranslation.utils import get_language
 
 from sage_blog.models import Post, PostCategory, PostTag
+from sage_blog.utils.cache import (
+    SIDEBAR_CACHE_NAMESPACE,
+    aget_or_compute,
+    get_or_compute,
+)
 
 
 class SageBlogContextMixin(ContextMixin):
@@ -11,20 +19,99 @@ class SageBlogContextMixin(ContextMixin):
     tags_days_ago = 0
     tags_min_count = 1
     tags_limit = 5
+    # Seconds the sidebar entries are cached for, None to query them on every page.
+    sidebar_cache_timeout = getattr(settings, "SAGE_BLOG_SIDEBAR_CACHE_TIMEOUT", None)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context[self.categories_context_name] = PostCategory.objects.annotate_total_posts()
-        context[self.recent_posts_context_name] = Post.objects.filter_recent_posts(
-            self.recent_posts_limit
+        if self.sidebar_cache_timeout:
+            sidebar = get_or_compute(
+                SIDEBAR_CACHE_NAMESPACE,
+                self.get_sidebar_cache_key_parts(),
+                self.get_sidebar_context_data,
+                self.sidebar_cache_timeout,
+            )
+        else:
+            sidebar = self.get_sidebar_querysets()
+        context.update(sidebar)
+        return context
+
+    def get_sidebar_cache_key_parts(self):
+        view_class = type(self)
+        return (
+            f"{view_class.__module__}.{view_class.__qualname__}",
+            get_language(),
+            self.categories_context_name,
+            self.recent_posts_context_name,
+            self.tags_context_name,
+            self.recent_posts_limit,
+            self.tags_days_ago,
+            self.tags_min_count,
+            self.tags_limit,
         )
-        context[self.tags_context_name] = (
-            PostTag.objects.exclude_unpublished_posts()
-            .annotate_total_posts()
-            .filter_trend_tags(
-                days_ago=self.tags_days_ago,
-                min_count=self.tags_min_count,
+
+    def get_sidebar_querysets(self):
+        """
+        Returns the querysets of the categories, recent posts and trending tags
+        of the sidebar by context name.
+        """
+        return {
+            self.categories_context_name: PostCategory.objects.annotate_total_posts(),
+            self.recent_posts_context_name: Post.objects.filter_recent_posts(
+                self.recent_posts_limit
+            ),
+            self.tags_context_name: PostTag.objects.filter_top_published_tags(
                 limit=self.tags_limit,
+                min_count=self.tags_min_count,
+                days_ago=self.tags_days_ago,
+            ),
+        }
+
+    def get_sidebar_context_data(self):
+        """
+        Returns the sidebar querysets evaluated into lists so they can be cached.
+        """
+        return {
+            name: list(queryset)
+            for name, queryset in self.get_sidebar_querysets().items()
+        }
+
+
+class AsyncSageBlogContextMixin(SageBlogContextMixin):
+    """
+    `SageBlogContextMixin` for async views, whose sidebar queries run on the
+    async ORM without blocking the event loop.
+
+    Async views call `aget_context_data` instead of `get_context_data`.
+    """
+
+    async def aget_context_data(self, **kwargs):
+        context = await sync_to_async(
+            super(SageBlogContextMixin, self).get_context_data
+        )(**kwargs)
+        if self.sidebar_cache_timeout:
+            sidebar = await aget_or_compute(
+                SIDEBAR_CACHE_NAMESPACE,
+                self.get_sidebar_cache_key_parts(),
+                self.aget_sidebar_context_data,
+                self.sidebar_cache_timeout,
             )
-        )
+        else:
+            sidebar = await self.aget_sidebar_context_data()
+        context.update(sidebar)
         return context
+
+    async def aget_sidebar_context_data(self):
+        """
+        Returns the sidebar querysets evaluated into lists.
+
+        The queries are awaited in turn, the async ORM runs them one after the
+        other on the same thread anyway.
+        """
+        return {
+            name: await self._alist(queryset)
+            for name, queryset in self.get_sidebar_querysets().items()
+        }
+
+    async def _alist(self, queryset):
+        return [obj async for obj in queryset.aiterator()]
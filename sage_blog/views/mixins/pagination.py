@@ -1,6 +1,59 @@
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
 from django.views.generic.base import ContextMixin
 
+from sage_blog.utils.pagination import (
+    COUNT_PAGINATORS,
+    InvalidCursor,
+    apaginate_by_keyset,
+    paginate_by_keyset,
+)
+
 
 class PaginatedMixin(ContextMixin):
     paginate_by = getattr(settings, "BLOG_POST_PER_PAGE", 15)
+    # Page with opaque cursors over `(published_at, id)` instead of page numbers.
+    keyset_pagination = getattr(settings, "SAGE_BLOG_KEYSET_PAGINATION", False)
+    cursor_param_name = "cursor"
+    # How numbered pages count posts: None for an exact `COUNT(*)`, "cached" or
+    # "estimated", see `COUNT_PAGINATORS`.
+    count_strategy = getattr(settings, "SAGE_BLOG_COUNT_STRATEGY", None)
+
+    def get_paginator(self, queryset, per_page, *args, **kwargs):
+        if self.count_strategy is None:
+            return super().get_paginator(queryset, per_page, *args, **kwargs)
+        if self.count_strategy not in COUNT_PAGINATORS:
+            raise ImproperlyConfigured(
+                f"Unknown count strategy {self.count_strategy!r}, expected one of "
+                f"{', '.join(COUNT_PAGINATORS)}."
+            )
+        paginator_class = COUNT_PAGINATORS[self.count_strategy]
+        return paginator_class(queryset, per_page, *args, **kwargs)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+
+        cursor = self.request.GET.get(self.cursor_param_name)
+        try:
+            page = paginate_by_keyset(queryset, cursor, page_size)
+        except InvalidCursor as error:
+            raise Http404(str(error)) from error
+        return None, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        Asynchronous `paginate_queryset` for async views, reading keyset pages
+        with the async ORM.
+        """
+        if not self.keyset_pagination:
+            return await sync_to_async(self.paginate_queryset)(queryset, page_size)
+
+        cursor = self.request.GET.get(self.cursor_param_name)
+        try:
+            page = await apaginate_by_keyset(queryset, cursor, page_size)
+        except InvalidCursor as error:
+            raise Http404(str(error)) from error
+        return None, page, page.object_list, page.has_other_pages()
@@ -6,12 +6,17 @@ from sage_blog.filters import PostFilter
 
 class SearchableMixin(ContextMixin):
     search_param_name = "search"
+    # Serve repeated searches from the cache of `PostQuerySet.cached_heavy_search`.
+    cache_search_results = True
 
     def get_queryset(self) -> QuerySet:
         qs = super().get_queryset()
         search_query = self.request.GET.get(self.search_param_name, "")
 
-        qs = qs.heavy_search(search_query)
+        if self.cache_search_results:
+            qs = qs.cached_heavy_search(search_query)
+        else:
+            qs = qs.heavy_search(search_query)
 
         if not search_query:
             filter_qs = PostFilter(self.request.GET, queryset=qs)
@@ -0,0 +1,21 @@
+from django.http import JsonResponse
+
+from sage_blog.search.typeahead import get_suggestions
+
+
+class TypeaheadMixin:
+    """
+    Answers `GET` requests with the typeahead suggestions of the
+    `query_param_name` parameter, e.g. `{"suggestions": [{"kind": "tag",
+    "slug": "diving", "title": "Diving"}]}`.
+    """
+
+    query_param_name = "q"
+    suggestions_limit = 10
+
+    def get_suggestions(self):
+        prefix = self.request.GET.get(self.query_param_name, "")
+        return get_suggestions(prefix, limit=self.suggestions_limit)
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"suggestions": self.get_suggestions()})